@@ -0,0 +1,239 @@
+import argparse
+import bisect
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+
+import degrees
+import snapshot
+
+# Power-law exponent of cast sizes and of how many movies people star in
+ALPHA = 2.1
+
+# Largest cast generated for one movie
+MAX_CAST = 500
+
+# Ways of loading the data that can be benchmarked
+LOADERS = ("dict", "compact", "snapshot")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark degrees loading and search "
+                    "on synthetic scale-free graphs."
+    )
+    parser.add_argument("--edges", type=int, default=10000,
+                        help="number of star rows to generate")
+    parser.add_argument("--directory", default=None,
+                        help="where to write the CSV files "
+                             "(default: synthetic-EDGES)")
+    parser.add_argument("--regenerate", action="store_true",
+                        help="overwrite existing CSV files")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--loaders", default=",".join(LOADERS))
+    parser.add_argument("--modes", default=",".join(sorted(degrees.SEARCHES)))
+    parser.add_argument("--landmarks", type=int, default=16, metavar="N",
+                        help="landmarks for the alt mode on compact loaders "
+                             "(0 to search without them)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help="write results as JSON (default: stdout)")
+    args = parser.parse_args()
+
+    directory = args.directory or f"synthetic-{args.edges}"
+    if args.regenerate or not os.path.exists(f"{directory}/stars.csv"):
+        print(f"Generating {args.edges} edges in {directory}...",
+              file=sys.stderr)
+        generate(directory, args.edges, args.seed)
+
+    loaders = args.loaders.split(",")
+    modes = args.modes.split(",")
+
+    # Build the snapshot up front, so only mapping it is measured
+    if "snapshot" in loaders:
+        isolated(build_snapshot, directory)
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "edges": args.edges,
+        "directory": directory,
+        "queries": args.queries,
+        "seed": args.seed,
+        "landmarks": args.landmarks,
+        "runs": []
+    }
+    for loader in loaders:
+        print(f"Benchmarking {loader}...", file=sys.stderr)
+        results["runs"].append(
+            isolated(run, directory, loader, modes, args.queries, args.seed,
+                     args.landmarks)
+        )
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+def generate(directory, edges, seed=0):
+    """
+    Write synthetic people.csv, movies.csv and stars.csv files with
+    about `edges` star rows to `directory`.
+
+    Cast sizes follow a power law, and cast members are drawn with
+    power-law weights, so a few hub actors appear in many movies as
+    in the real IMDb data.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    # Draw cast sizes until the edge budget is spent
+    casts = []
+    total = 0
+    while total < edges:
+        size = min(power_law(rng), MAX_CAST, edges - total)
+        casts.append(size)
+        total += size
+
+    # People get power-law weights; cumulative weights allow bisection
+    num_people = max(2, edges // 3)
+    weights = list(itertools.accumulate(
+        power_law(rng) for _ in range(num_people)
+    ))
+
+    with open(f"{directory}/people.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for p in range(num_people):
+            writer.writerow([p, f"Person {p}", 1900 + rng.randrange(100)])
+
+    with open(f"{directory}/movies.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for m in range(len(casts)):
+            writer.writerow([m, f"Movie {m}", 1920 + rng.randrange(100)])
+
+    with open(f"{directory}/stars.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for m, size in enumerate(casts):
+            cast = set()
+            while len(cast) < min(size, num_people):
+                point = rng.random() * weights[-1]
+                cast.add(bisect.bisect_right(weights, point))
+            for p in cast:
+                writer.writerow([p, m])
+
+
+def power_law(rng):
+    """
+    Returns a positive integer drawn from a discrete power law
+    with exponent `ALPHA`.
+    """
+    return int((1 - rng.random()) ** (-1 / (ALPHA - 1)))
+
+
+def isolated(function, *args):
+    """
+    Runs `function(*args)` in a fresh process, so its peak memory is
+    measured without anything loaded by other runs.
+    """
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(function, args)
+
+
+def build_snapshot(directory):
+    """
+    Writes the snapshot for `directory` if it is missing or stale.
+    """
+    snapshot.load(directory)
+
+
+def run(directory, loader, modes, queries, seed, landmarks=0):
+    """
+    Loads `directory` with `loader`, then times `queries` random
+    shortest-path queries with each search mode.
+
+    With a compact loader, the alt mode uses an index of `landmarks`
+    landmarks, timed separately and kept out of the peak memory.
+    """
+    result = {"loader": loader}
+    baseline = peak_memory()
+
+    # Time the load
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=loader == "compact",
+                      snapshot=loader == "snapshot")
+    result["load_seconds"] = time.perf_counter() - start
+    result["peak_memory_bytes"] = peak_memory() - baseline
+
+    # Time loading (or building) the landmark index
+    if landmarks > 0 and "alt" in modes and degrees.graph is not None:
+        start = time.perf_counter()
+        degrees.load_landmarks(directory, landmarks)
+        result["landmarks_seconds"] = time.perf_counter() - start
+
+    # Pick query pairs reproducibly from the loaded people
+    if degrees.graph is not None:
+        person_ids = sorted(degrees.graph.person_ids)
+    else:
+        person_ids = sorted(degrees.people)
+    rng = random.Random(seed)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+             for _ in range(queries)]
+
+    result["modes"] = {}
+    for mode in modes:
+        latencies = []
+        expanded = []
+        connected = 0
+        for source, target in pairs:
+            start = time.perf_counter()
+            path = degrees.shortest_path(source, target, mode)
+            latencies.append(time.perf_counter() - start)
+            expanded.append(degrees.search_stats["expanded"])
+            connected += path is not None
+        latencies.sort()
+        result["modes"][mode] = {
+            "connected": connected,
+            "mean_expanded": sum(expanded) / len(expanded),
+            "latency_seconds": {
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1],
+                "mean": sum(latencies) / len(latencies)
+            }
+        }
+    return result
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of this process in bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values, p):
+    """
+    Returns the `p`th percentile of sorted `values`, by nearest rank.
+    """
+    rank = max(1, -(-len(values) * p // 100))
+    return values[rank - 1]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import collections
+import threading
+
+
+class NeighborCache():
+    """
+    Least-recently-used cache of co-star neighbor collections.
+
+    Memory is bounded by `maxsize`, the total number of (movie, person)
+    pairs held across all entries, so one hub actor with thousands of
+    co-stars costs as much as many minor ones.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Returns the cached neighbors of `key`, calling `compute(key)`
+        and caching the result on a miss.
+        """
+        with self.lock:
+            neighbors = self.entries.get(key)
+            if neighbors is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return neighbors
+            self.misses += 1
+
+        neighbors = compute(key)
+
+        # Entries larger than the whole cache are never stored
+        if len(neighbors) > self.maxsize:
+            return neighbors
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = neighbors
+                self.size += len(neighbors)
+            while self.size > self.maxsize:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return neighbors
+
+    def wrap(self, compute):
+        """
+        Returns a cached version of the neighbor function `compute`.
+        """
+        def cached(key):
+            return self.get(key, compute)
+        return cached
+
+    def discard(self, keys):
+        """
+        Drops the cached neighbors of each of `keys`, if present.
+        """
+        with self.lock:
+            for key in keys:
+                neighbors = self.entries.pop(key, None)
+                if neighbors is not None:
+                    self.size -= len(neighbors)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def info(self):
+        """
+        Returns a dictionary of cache counters.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "size": self.size,
+                "maxsize": self.maxsize
+            }
@@ -1,7 +1,17 @@
+import argparse
 import csv
+import itertools
+import os
 import sys
 
+import paths
+from cache import NeighborCache
+from ingest import build_graph
+from landmarks import load as load_oracle
+from nameindex import NameIndex
+from snapshot import load as load_snapshot
 from util import Node, StackFrontier, QueueFrontier
+from yearindex import UNKNOWN, YearIndex, parse_year
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +22,63 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed CSR graph, used instead of the dictionaries when loaded
+graph = None
 
-def load_data(directory):
+# Counters from the most recent search
+search_stats = {"expanded": 0}
+
+# Optional LRU cache of neighbors, see enable_neighbor_cache
+neighbor_cache = None
+
+# Counts of star rows dropped at load for an unknown person or movie
+dropped = {"people": 0, "movies": 0}
+
+# Optional prefix and trigram index over names, see build_name_index
+name_index = None
+
+# Optional landmark distance oracle for the compact graph, see load_landmarks
+landmark_oracle = None
+
+# Per-person movies by year for filtered searches, see build_year_index
+year_index = None
+
+
+def load_data(directory, compact=False, snapshot=False, processes=1,
+              progress=False):
     """
     Load data from CSV files into memory.
+
+    If `compact` is True, stream the files into a `CompactGraph` instead
+    of the `names`, `people` and `movies` dictionaries, using up to
+    `processes` workers and reporting `progress` on stderr. If `snapshot`
+    is True, memory-map the compact graph from the directory's binary
+    snapshot, writing the snapshot first if it is missing or out of date.
     """
+    global graph, dropped, name_index, landmark_oracle, year_index
+
+    # Cached neighbors and indexes belong to the previous data
+    if neighbor_cache is not None:
+        neighbor_cache.clear()
+    name_index = None
+    landmark_oracle = None
+    year_index = None
+
+    # Map compact graph from binary snapshot
+    if snapshot:
+        graph = load_snapshot(directory, processes=processes,
+                              progress=progress)
+        dropped = graph.dropped
+        return
+
+    # Load compact integer-indexed graph
+    if compact:
+        graph = build_graph(directory, processes, progress)
+        dropped = graph.dropped
+        return
+    graph = None
+    dropped = {"people": 0, "movies": 0}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -45,22 +107,172 @@ def load_data(directory):
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            try:
+            if row["person_id"] not in people:
+                dropped["people"] += 1
+            elif row["movie_id"] not in movies:
+                dropped["movies"] += 1
+            else:
                 people[row["person_id"]]["movies"].add(row["movie_id"])
                 movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+
+
+def load_delta(directory):
+    """
+    Add the people, movies and stars in delta CSV files to the loaded
+    data, in time proportional to the size of the delta rather than
+    of the whole dataset.
+
+    Any of people.csv, movies.csv and stars.csv may be missing from
+    `directory`. Returns a dictionary counting the rows added, and the
+    rows skipped as duplicates or for referencing unknown ids. Adding a
+    person drops a built name index, as with `add_person`, so call
+    `build_name_index` again once the deltas are loaded.
+    """
+    counts = {"people": 0, "movies": 0, "stars": 0, "skipped": 0}
+
+    # Load people
+    path = os.path.join(directory, "people.csv")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if add_person(row["id"], row["name"], row["birth"]):
+                    counts["people"] += 1
+                else:
+                    counts["skipped"] += 1
+
+    # Load movies
+    path = os.path.join(directory, "movies.csv")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if add_movie(row["id"], row["title"], row["year"]):
+                    counts["movies"] += 1
+                else:
+                    counts["skipped"] += 1
+
+    # Load stars
+    path = os.path.join(directory, "stars.csv")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if add_star(row["person_id"], row["movie_id"]):
+                    counts["stars"] += 1
+                else:
+                    counts["skipped"] += 1
+
+    return counts
+
+
+def add_person(person_id, name, birth):
+    """
+    Add a person to the loaded data. Returns False if the id exists.
+
+    The name index, if built, is dropped and must be rebuilt.
+    """
+    global name_index
+    if has_person(person_id):
+        return False
+    name_index = None
+    if graph is not None:
+        graph.add_person(person_id, name, birth)
+        return True
+    people[person_id] = {"name": name, "birth": birth, "movies": set()}
+    names.setdefault(name.lower(), set()).add(person_id)
+    return True
+
+
+def add_movie(movie_id, title, year):
+    """
+    Add a movie to the loaded data. Returns False if the id exists.
+    """
+    if graph is not None:
+        if movie_id in graph.movie_index:
+            return False
+        graph.add_movie(movie_id, title, year)
+        return True
+    if movie_id in movies:
+        return False
+    movies[movie_id] = {"title": title, "year": year, "stars": set()}
+    return True
+
+
+def add_star(person_id, movie_id):
+    """
+    Add a person to the cast of a movie, dropping the cached neighbors
+    of everyone in that cast. Returns False if either id is unknown or
+    the person already starred in the movie.
+    """
+    if graph is not None:
+        p = graph.person_index.get(person_id)
+        m = graph.movie_index.get(movie_id)
+        if p is None or m is None or not graph.add_star(p, m):
+            return False
+        if neighbor_cache is not None:
+            neighbor_cache.discard(graph.stars_of(m))
+        return True
+    if person_id not in people or movie_id not in movies:
+        return False
+    if movie_id in people[person_id]["movies"]:
+        return False
+    people[person_id]["movies"].add(movie_id)
+    movies[movie_id]["stars"].add(person_id)
+    if neighbor_cache is not None:
+        neighbor_cache.discard(movies[movie_id]["stars"])
+    return True
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two actors."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="load an integer-indexed CSR graph")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="memory-map the compact graph from a snapshot")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes for compact loading")
+    parser.add_argument("--cache", type=int, default=0, metavar="PAIRS",
+                        help="cache up to PAIRS neighbor pairs (default: off)")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="suggest similar names when a name is not found")
+    parser.add_argument("--delta", action="append", default=[], metavar="DIR",
+                        help="add delta CSV files from DIR after loading")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="N",
+                        help="load or build an index of N landmarks for the "
+                             "alt search mode and bounds (needs --compact "
+                             "or --snapshot)")
+    parser.add_argument("--mode", choices=sorted(SEARCHES), default="bfs",
+                        help="search strategy (default: bfs)")
+    parser.add_argument("--years", type=year_range, metavar="FIRST-LAST",
+                        help="only follow movies released in these years, "
+                             "either of which may be left out")
+    parser.add_argument("--exclude", action="append", default=[],
+                        metavar="MOVIE_ID",
+                        help="never follow this movie (may be repeated)")
+    parser.add_argument("--paths", type=int, default=0, metavar="K",
+                        help="list the K shortest alternative chains")
+    args = parser.parse_args()
+    if args.landmarks > 0 and not (args.compact or args.snapshot):
+        parser.error("--landmarks needs --compact or --snapshot")
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(args.directory, args.compact, args.snapshot, args.processes,
+              progress=True)
+    enable_neighbor_cache(args.cache)
+    for delta in args.delta:
+        counts = load_delta(delta)
+        print(f"Added {counts['people']} people, {counts['movies']} movies "
+              f"and {counts['stars']} stars from {delta}.")
+    if args.fuzzy:
+        build_name_index()
+    if args.landmarks > 0:
+        load_landmarks(args.directory, args.landmarks)
     print("Data loaded.")
+    if dropped["people"] or dropped["movies"]:
+        print(f"Dropped {dropped['people']} stars with unknown people "
+              f"and {dropped['movies']} with unknown movies.")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,26 +281,156 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    # List alternative chains, shortest first
+    if args.paths > 0:
+        found = False
+        chains = simple_paths(source, target, years=args.years,
+                              exclude=args.exclude)
+        for path in itertools.islice(chains, args.paths):
+            if found:
+                print()
+            print_path(source, path)
+            found = True
+        if not found:
+            print("Not connected.")
+        return
+
+    # Bounds describe the whole graph, not a filtered part of it
+    if landmark_oracle is not None and args.years is None and not args.exclude:
+        lower, upper = separation_bounds(source, target)
+        print(f"Landmark bounds: {lower} to {upper} degrees.")
+
+    path = shortest_path(source, target, args.mode,
+                         years=args.years, exclude=args.exclude)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
 
 
-def shortest_path(source, target):
+def print_path(source, path):
+    """
+    Prints the degrees of separation along a path from `source`.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = person_for_id(path[i][1])["name"]
+        person2 = person_for_id(path[i + 1][1])["name"]
+        movie = movie_for_id(path[i + 1][0])["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def shortest_path(source, target, mode="bfs", years=None, exclude=None,
+                  predicate=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `mode` selects the search strategy from `SEARCHES`. The search may
+    be limited to movies released within `years`, an inclusive (first,
+    last) pair either of which may be None, to movies not in the
+    `exclude` collection of movie_ids, and to movies for whose movie_id
+    `predicate` returns True. See `filtered_neighbors`.
+
+    If no possible path, returns None. A person is connected to
+    themselves by the empty path, whatever the mode.
+    """
+    if source == target:
+        return []
+
+    search = SEARCHES[mode]
+    filtered = years is not None or exclude or predicate is not None
+
+    # Landmark upper bounds only hold for the whole graph
+    if filtered and search is landmark_search:
+        search = filtered_landmark_search
+
+    # Search over integer indices when the compact graph is loaded
+    if graph is not None:
+        if filtered:
+            neighbors = filtered_neighbors(years, exclude, predicate)
+        else:
+            neighbors = graph.neighbors
+        if neighbor_cache is not None and not filtered:
+            neighbors = neighbor_cache.wrap(neighbors)
+        path = search(
+            graph.person_index[source],
+            graph.person_index[target],
+            neighbors
+        )
+        return None if path is None else graph.path_to_ids(path)
+
+    if filtered:
+        return search(source, target,
+                      filtered_neighbors(years, exclude, predicate))
+    return search(source, target, neighbors_for_person)
+
+
+def filtered_neighbors(years=None, exclude=None, predicate=None):
+    """
+    Returns a neighbor function over the loaded data that only follows
+    movies released within `years`, not in `exclude`, and accepted by
+    `predicate(movie_id)`, evaluating the predicate once per movie.
+
+    With the compact graph, the year range is looked up in the year
+    index, so movies outside it are never visited. Filtered neighbors
+    bypass the neighbor cache, which holds unfiltered neighbors.
+    """
+    first, last = years if years is not None else (None, None)
+    exclude = set(exclude or ())
+    verdicts = {}
+
+    def allowed(movie_id):
+        verdict = verdicts.get(movie_id)
+        if verdict is None:
+            verdict = verdicts[movie_id] = (
+                movie_id not in exclude
+                and (predicate is None or bool(predicate(movie_id)))
+            )
+        return verdict
+
+    if graph is not None:
+        index = year_index
+        if index is None or index.stale():
+            index = build_year_index()
+        movie_ids = graph.movie_ids
+        if exclude or predicate is not None:
+            def allowed_index(m):
+                return allowed(movie_ids[m])
+        else:
+            allowed_index = None
+
+        def neighbors_for(p):
+            return index.neighbors(p, first, last, allowed_index)
+        return neighbors_for
+
+    def in_years(movie_id):
+        if first is None and last is None:
+            return True
+        year = parse_year(movies[movie_id]["year"])
+        return (year != UNKNOWN
+                and (first is None or year >= first)
+                and (last is None or year <= last))
+
+    def neighbors_for(person_id):
+        neighbors = set()
+        for movie_id in people[person_id]["movies"]:
+            if in_years(movie_id) and allowed(movie_id):
+                for star_id in movies[movie_id]["stars"]:
+                    neighbors.add((movie_id, star_id))
+        return neighbors
+    return neighbors_for
+
+
+def breadth_first_search(source, target, neighbors_for):
+    """
+    Returns the shortest list of (action, state) pairs that connect
+    the source state to the target state, where `neighbors_for(state)`
+    returns the (action, state) pairs adjacent to a state.
+
     If no possible path, returns None.
     """
 
@@ -101,6 +443,7 @@ def shortest_path(source, target):
 
     # Initialize an empty explored set
     explored = set()
+    search_stats["expanded"] = 0
 
     # Keep looping until shortest path found
     while True:
@@ -114,9 +457,10 @@ def shortest_path(source, target):
 
         # Add node to explored set
         explored.add(node.state)
+        search_stats["expanded"] += 1
 
         # Determine neighbors for current node
-        neighbors = neighbors_for_person(node.state)
+        neighbors = neighbors_for(node.state)
 
         # Check neighbors for target
         for movie_id, person_id in neighbors:
@@ -153,20 +497,224 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def bidirectional_search(source, target, neighbors_for):
+    """
+    Returns the shortest list of (action, state) pairs that connect
+    the source state to the target state, growing one breadth-first
+    frontier from each end and stopping where they meet.
+
+    The graph is assumed to be undirected, so `neighbors_for` is used
+    for both directions. If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached state to (previous state, action) on its side
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    search_stats["expanded"] = 0
+
+    while forward_frontier and backward_frontier:
+
+        # Always grow the smaller frontier by one full level
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, others = forward_frontier, forward, backward
+        else:
+            frontier, parents, others = backward_frontier, backward, forward
+
+        # Expand the level, remembering the best meeting point
+        best = None
+        next_frontier = []
+        for state in frontier:
+            search_stats["expanded"] += 1
+            for action, neighbor in neighbors_for(state):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (state, action)
+                next_frontier.append(neighbor)
+                if neighbor in others:
+                    length = (path_length(forward, neighbor)
+                              + path_length(backward, neighbor))
+                    if best is None or length < best[0]:
+                        best = (length, neighbor)
+
+        if best is not None:
+            return join_paths(forward, backward, best[1])
+
+        if parents is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def path_length(parents, state):
+    """
+    Returns the number of steps from `state` back to the root
+    of a parent map.
+    """
+    length = 0
+    while parents[state] is not None:
+        state = parents[state][0]
+        length += 1
+    return length
+
+
+def join_paths(forward, backward, meet):
+    """
+    Joins the forward and backward parent maps of a bidirectional
+    search at `meet` into a list of (action, state) pairs.
+    """
+
+    # Walk from the meeting point back to the source
+    path = []
+    state = meet
+    while forward[state] is not None:
+        previous, action = forward[state]
+        path.append((action, state))
+        state = previous
+    path.reverse()
+
+    # Walk from the meeting point forward to the target
+    state = meet
+    while backward[state] is not None:
+        following, action = backward[state]
+        path.append((action, following))
+        state = following
+
+    return path
+
+
+def landmark_search(source, target, neighbors_for):
+    """
+    Returns the shortest list of (action, state) pairs that connect
+    the source state to the target state, by A* search guided by the
+    landmark distance bounds.
+
+    Falls back to `bidirectional_search` when no landmarks are loaded,
+    or the graph has changed since their distances were computed.
+    """
+    if landmark_oracle is None or landmark_oracle.stale():
+        return bidirectional_search(source, target, neighbors_for)
+    return landmark_oracle.search(source, target, neighbors_for, search_stats)
+
+
+def filtered_landmark_search(source, target, neighbors_for):
+    """
+    Like `landmark_search`, where `neighbors_for` follows only some
+    movies. Landmark lower bounds still hold, but upper bounds do not.
+    """
+    if landmark_oracle is None or landmark_oracle.stale():
+        return bidirectional_search(source, target, neighbors_for)
+    return landmark_oracle.search(source, target, neighbors_for, search_stats,
+                                  exact=False)
+
+
+# Search strategies available to shortest_path
+SEARCHES = {
+    "bfs": breadth_first_search,
+    "bidirectional": bidirectional_search,
+    "alt": landmark_search,
+}
+
+
+def load_landmarks(directory, count=16, strategy="farthest"):
+    """
+    Load the landmark distance oracle for the compact graph from
+    `directory`, building and saving it with `count` landmarks chosen
+    by `strategy` if it is missing or out of date.
+    """
+    global landmark_oracle
+    if graph is None:
+        raise Exception("landmarks need the compact graph")
+    landmark_oracle = load_oracle(graph, directory, count, strategy)
+    return landmark_oracle
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two people from the landmark distances, without searching. Both
+    are `math.inf` if the people are known not to be connected.
+
+    Landmarks must be loaded, and the graph unchanged since.
+    """
+    if landmark_oracle is None or landmark_oracle.stale():
+        raise Exception("no up-to-date landmarks loaded")
+    return landmark_oracle.bounds(
+        graph.person_index[source], graph.person_index[target]
+    )
+
+
+def all_shortest_paths(source, target):
+    """
+    Lazily yields every shortest list of (movie_id, person_id) pairs
+    that connects the source to the target.
+    """
+    if graph is not None:
+        for path in paths.all_shortest_paths(
+            graph.person_index[source], graph.person_index[target],
+            graph.neighbors
+        ):
+            yield graph.path_to_ids(path)
+    else:
+        yield from paths.all_shortest_paths(
+            source, target, neighbors_for_person
+        )
+
+
+def simple_paths(source, target, max_length=None, years=None,
+                 exclude=None, predicate=None):
+    """
+    Lazily yields lists of (movie_id, person_id) pairs connecting the
+    source to the target without repeating a person, shortest first.
+
+    `years`, `exclude` and `predicate` limit the movies followed, as
+    for `shortest_path`.
+    """
+    filtered = years is not None or exclude or predicate is not None
+    if graph is not None:
+        if filtered:
+            neighbors = filtered_neighbors(years, exclude, predicate)
+        else:
+            neighbors = graph.neighbors
+        for path in paths.simple_paths(
+            graph.person_index[source], graph.person_index[target],
+            neighbors, max_length
+        ):
+            yield graph.path_to_ids(path)
+    else:
+        if filtered:
+            neighbors = filtered_neighbors(years, exclude, predicate)
+        else:
+            neighbors = neighbors_for_person
+        yield from paths.simple_paths(source, target, neighbors, max_length)
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
+        if name_index is not None:
+            suggestions = name_index.search(name, limit=5)
+            if suggestions:
+                print("Did you mean:")
+                for person in suggestions:
+                    print(f"ID: {person['id']}, Name: {person['name']}, "
+                          f"Birth: {person['birth']}")
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            info = person_for_id(person_id)
+            name = info["name"]
+            birth = info["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -179,10 +727,76 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name):
+    """
+    Returns a list of the IMDB ids of every person with a given name.
+    """
+    if graph is not None:
+        return graph.person_ids_for_name(name)
+    return list(names.get(name.lower(), set()))
+
+
+def build_name_index():
+    """
+    Build a `NameIndex` over every loaded person for autocomplete and
+    suggestions when a name is not found.
+    """
+    global name_index
+    if graph is not None:
+        name_index = NameIndex(
+            graph.person_ids, graph.person_names, graph.person_births
+        )
+    else:
+        person_ids = list(people)
+        name_index = NameIndex(
+            person_ids,
+            [people[person_id]["name"] for person_id in person_ids],
+            [people[person_id]["birth"] for person_id in person_ids]
+        )
+    return name_index
+
+
+def build_year_index():
+    """
+    Build a `YearIndex` over the compact graph for year-filtered
+    searches, replacing one built before the graph last changed.
+    """
+    global year_index
+    year_index = YearIndex(graph)
+    return year_index
+
+
+def year_range(text):
+    """
+    Parses a "FIRST-LAST" range of years, either of which may be
+    left out, into a (first, last) pair of ints or None.
+    """
+    first, _, last = text.partition("-")
+    try:
+        return (int(first) if first else None, int(last) if last else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid year range {text!r}")
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    With a neighbor cache enabled, the returned set may be shared
+    and must not be modified.
+    """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
+    if neighbor_cache is not None:
+        return neighbor_cache.get(person_id, costars)
+    return costars(person_id)
+
+
+def costars(person_id):
+    """
+    Builds the set of (movie_id, person_id) neighbor pairs
+    of a person from the `people` and `movies` dictionaries.
     """
     movie_ids = people[person_id]["movies"]
     neighbors = set()
@@ -192,5 +806,41 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def enable_neighbor_cache(maxsize):
+    """
+    Cache up to `maxsize` neighbor pairs across searches, evicting the
+    least recently used people first. A `maxsize` of 0 disables caching.
+    """
+    global neighbor_cache
+    neighbor_cache = NeighborCache(maxsize) if maxsize > 0 else None
+
+
+def person_for_id(person_id):
+    """
+    Returns a dictionary with the name and birth of a person.
+    """
+    if graph is not None:
+        return graph.person(person_id)
+    return people[person_id]
+
+
+def has_person(person_id):
+    """
+    Returns True if `person_id` is a known IMDB person id.
+    """
+    if graph is not None:
+        return person_id in graph.person_index
+    return person_id in people
+
+
+def movie_for_id(movie_id):
+    """
+    Returns a dictionary with the title and year of a movie.
+    """
+    if graph is not None:
+        return graph.movie(movie_id)
+    return movies[movie_id]
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+import argparse
+import array
+import collections
+import concurrent.futures
+import csv
+import random
+import sys
+
+import snapshot
+from ingest import build_graph
+
+# Graph shared with worker processes
+graph = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Degrees of separation from one person to everyone, "
+                    "or sampled across the whole graph."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="memory-map the graph from a snapshot")
+    parser.add_argument("--source", metavar="NAME",
+                        help="name or IMDB id to measure distances from")
+    parser.add_argument("--output", metavar="FILE",
+                        help="write person_id,distance rows for --source")
+    parser.add_argument("--samples", type=int, default=0,
+                        help="number of random sources to sample")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if args.source is None and args.samples <= 0:
+        parser.error("expected --source or --samples")
+
+    print("Loading data...", file=sys.stderr)
+    init_worker(args.directory, args.snapshot)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.source is not None:
+        source = person_index_for_name(args.source)
+        distance, _, _ = single_source(graph, source)
+        print(f"Degrees of separation from {graph.person_names[source]}:")
+        print_histogram(histogram(distance), graph.num_people())
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["person_id", "distance"])
+                for p, d in enumerate(distance):
+                    if d >= 0:
+                        writer.writerow([graph.person_ids[p], d])
+
+    if args.samples > 0:
+        estimate = sample(args.directory, args.snapshot, args.samples,
+                          args.processes, args.seed)
+        print(f"Sampled {estimate['samples']} sources:")
+        print_histogram(estimate["histogram"], estimate["pairs"])
+        print(f"Mean separation: {estimate['mean']:.3f}")
+        print(f"Diameter (lower bound): {estimate['diameter']}")
+
+
+def init_worker(directory, use_snapshot):
+    """
+    Load the compact graph, unless it was inherited by fork.
+    """
+    global graph
+    if graph is not None:
+        return
+    if use_snapshot:
+        graph = snapshot.load(directory)
+    else:
+        graph = build_graph(directory)
+
+
+def person_index_for_name(name):
+    """
+    Returns the index of the person with a given name or IMDB id.
+    """
+    people = graph.names.get(name.lower(), [])
+    if len(people) == 1:
+        return people[0]
+    if name in graph.person_index:
+        return graph.person_index[name]
+    if people:
+        ids = ", ".join(graph.person_ids[p] for p in people)
+        sys.exit(f"Ambiguous name, pass one of these ids instead: {ids}")
+    sys.exit("Person not found.")
+
+
+def single_source(graph, source):
+    """
+    Breadth-first search from person index `source` to every person.
+
+    Returns (distance, parent, parent_movie) arrays indexed by person:
+    the degrees of separation (-1 if unreachable), and the person and
+    movie through which each person was first reached (-1 for none).
+    """
+    movies_of = graph.movies_of
+    stars_of = graph.stars_of
+
+    n = graph.num_people()
+    distance = array.array("i", [-1]) * n
+    parent = array.array("i", [-1]) * n
+    parent_movie = array.array("i", [-1]) * n
+
+    # A movie's whole cast is reached at once, so expand each movie once
+    expanded = bytearray(graph.num_movies())
+
+    distance[source] = 0
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for p in frontier:
+            for m in movies_of(p):
+                if expanded[m]:
+                    continue
+                expanded[m] = 1
+                for q in stars_of(m):
+                    if distance[q] < 0:
+                        distance[q] = depth
+                        parent[q] = p
+                        parent_movie[q] = m
+                        next_frontier.append(q)
+        frontier = next_frontier
+
+    return distance, parent, parent_movie
+
+
+def path_from_parents(parent, parent_movie, target):
+    """
+    Returns the list of (movie, person) index pairs leading from the
+    search source to `target`, which must have been reached. The path
+    to the source itself is empty.
+    """
+    path = []
+    while parent[target] >= 0:
+        path.append((parent_movie[target], target))
+        target = parent[target]
+    path.reverse()
+    return path
+
+
+def histogram(distance):
+    """
+    Returns a Counter mapping degrees of separation to the number of
+    people at that distance, excluding unreachable people.
+    """
+    counts = collections.Counter(distance)
+    counts.pop(-1, None)
+    return counts
+
+
+def profile(source):
+    """
+    Runs a single-source search in a worker and returns its histogram,
+    without the source itself at distance 0, and farthest person, so
+    only small results cross processes.
+    """
+    distance, _, _ = single_source(graph, source)
+    farthest = max(range(len(distance)), key=distance.__getitem__)
+    counts = histogram(distance)
+    del counts[0]
+    return counts, farthest
+
+
+def sample(directory, use_snapshot, samples, processes=1, seed=None):
+    """
+    Estimates the graph-wide distribution of degrees of separation by
+    searching from `samples` random people across `processes` workers.
+
+    The diameter lower bound is the largest distance seen, improved by
+    one extra search from the farthest person found (a double sweep).
+    """
+    rng = random.Random(seed)
+    sources = [rng.randrange(graph.num_people()) for _ in range(samples)]
+
+    # Search from each sampled source
+    if processes > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=init_worker,
+            initargs=(directory, use_snapshot)
+        ) as pool:
+            results = list(pool.map(profile, sources))
+    else:
+        results = [profile(source) for source in sources]
+
+    # Combine histograms and sweep from the farthest person found
+    total = collections.Counter()
+    diameter, farthest = 0, sources[0]
+    for counts, far in results:
+        total.update(counts)
+        if max(counts, default=0) > diameter:
+            diameter, farthest = max(counts), far
+    diameter = max(diameter, max(profile(farthest)[0], default=0))
+
+    pairs = sum(total.values())
+    return {
+        "samples": samples,
+        "histogram": total,
+        "pairs": pairs,
+        "mean": (sum(d * c for d, c in total.items()) / pairs
+                 if pairs else 0.0),
+        "diameter": diameter
+    }
+
+
+def print_histogram(counts, total):
+    for d in sorted(counts):
+        print(f"  {d}: {counts[d]} ({counts[d] / total:.2%})")
+
+
+if __name__ == "__main__":
+    main()
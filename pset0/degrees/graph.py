@@ -0,0 +1,332 @@
+import array
+
+
+class CompactGraph():
+    """
+    People/movies graph with IMDb ids interned to dense integers.
+
+    Person and movie ids are mapped to indices 0..n-1 and the bipartite
+    star relation is stored twice in CSR (offsets + neighbors) form:
+    the movies of person `p` are
+        person_movies[person_offsets[p]:person_offsets[p + 1]]
+    and the stars of movie `m` are
+        movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+
+    People, movies and stars added after the CSR arrays are built are
+    kept in small overlay dictionaries rather than rebuilding them.
+    """
+
+    def __init__(self):
+        # Maps person indices to IMDb ids, names and birth years
+        self.person_ids = []
+        self.person_names = []
+        self.person_births = []
+
+        # Maps movie indices to IMDb ids, titles and years
+        self.movie_ids = []
+        self.movie_titles = []
+        self.movie_years = []
+
+        # Maps IMDb ids back to indices
+        self.person_index = {}
+        self.movie_index = {}
+
+        # Maps lowercase names to a list of person indices
+        self.names = {}
+
+        # CSR adjacency in both directions
+        self.person_offsets = array.array("q", [0])
+        self.person_movies = array.array("i")
+        self.movie_offsets = array.array("q", [0])
+        self.movie_stars = array.array("i")
+
+        # Stars added since the CSR arrays were built
+        self.extra_movies = {}
+        self.extra_stars = {}
+
+        # Incremented whenever the graph changes, to invalidate indexes
+        self.version = 0
+
+        # Star rows dropped at load for an unknown person or movie
+        self.dropped = {"people": 0, "movies": 0}
+
+        # Memory map backing the arrays when loaded from a snapshot
+        self.snapshot = None
+
+    def add_person(self, person_id, name, birth):
+        """
+        Intern a person and return their index.
+        """
+        self.make_appendable()
+        p = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.person_index[person_id] = p
+        self.names.setdefault(name.lower(), []).append(p)
+        self.version += 1
+        return p
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Intern a movie and return its index.
+        """
+        self.make_appendable()
+        m = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.movie_index[movie_id] = m
+        self.version += 1
+        return m
+
+    def add_star(self, p, m):
+        """
+        Add person `p` to the cast of movie `m` without rebuilding the
+        CSR arrays. Returns False if they were already connected.
+        """
+        if m in self.movies_of(p):
+            return False
+        self.extra_movies.setdefault(p, []).append(m)
+        self.extra_stars.setdefault(m, []).append(p)
+        self.version += 1
+        return True
+
+    def merge(self):
+        """
+        Fold stars added since the CSR arrays were built into new CSR
+        arrays covering every person and movie.
+        """
+        star_people = array.array("i")
+        star_movies = array.array("i")
+        for p in range(self.num_people()):
+            for m in self.movies_of(p):
+                star_people.append(p)
+                star_movies.append(m)
+        self.extra_movies = {}
+        self.extra_stars = {}
+        self.set_stars(star_people, star_movies)
+
+    def make_appendable(self):
+        """
+        Wrap read-only tables, such as those mapped from a snapshot,
+        so that people and movies can be appended to them. Tables that
+        can already be appended to are left as they are.
+        """
+        for name in ("person_ids", "person_names", "person_births",
+                     "movie_ids", "movie_titles", "movie_years"):
+            table = getattr(self, name)
+            if not isinstance(table, (list, Appendable)):
+                setattr(self, name, Appendable(table))
+        for name in ("person_index", "movie_index", "names"):
+            index = getattr(self, name)
+            if not isinstance(index, (dict, AppendableIndex)):
+                setattr(self, name, AppendableIndex(index))
+
+    def set_stars(self, star_people, star_movies):
+        """
+        Build both CSR adjacencies from parallel arrays of
+        (person index, movie index) star edges.
+        """
+        self.person_offsets, self.person_movies = csr(
+            len(self.person_ids), star_people, star_movies
+        )
+        self.movie_offsets, self.movie_stars = csr(
+            len(self.movie_ids), star_movies, star_people
+        )
+
+    def num_people(self):
+        return len(self.person_ids)
+
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def has_overlay(self):
+        """
+        Returns True if stars were added after the CSR arrays were built.
+        """
+        return bool(self.extra_movies)
+
+    def movies_of(self, p):
+        """
+        Returns the movie indices person `p` starred in.
+        """
+        if p < len(self.person_offsets) - 1:
+            movies = self.person_movies[
+                self.person_offsets[p]:self.person_offsets[p + 1]
+            ]
+        else:
+            movies = ()
+        extra = self.extra_movies.get(p)
+        return [*movies, *extra] if extra else movies
+
+    def stars_of(self, m):
+        """
+        Returns the person indices who starred in movie `m`.
+        """
+        if m < len(self.movie_offsets) - 1:
+            stars = self.movie_stars[
+                self.movie_offsets[m]:self.movie_offsets[m + 1]
+            ]
+        else:
+            stars = ()
+        extra = self.extra_stars.get(m)
+        return [*stars, *extra] if extra else stars
+
+    def neighbors(self, p):
+        """
+        Returns (movie, person) index pairs for people
+        who starred with person `p`.
+        """
+        if self.extra_movies:
+            return [(m, q) for m in self.movies_of(p)
+                    for q in self.stars_of(m)]
+
+        person_offsets = self.person_offsets
+        if p >= len(person_offsets) - 1:
+            return []
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        neighbors = []
+        for i in range(person_offsets[p], person_offsets[p + 1]):
+            m = person_movies[i]
+            for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                neighbors.append((m, movie_stars[j]))
+        return neighbors
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people who starred
+        with a given person, in the same form as
+        `degrees.neighbors_for_person`.
+        """
+        return {
+            (self.movie_ids[m], self.person_ids[q])
+            for m, q in self.neighbors(self.person_index[person_id])
+        }
+
+    def path_to_ids(self, path):
+        """
+        Converts a list of (movie, person) index pairs to
+        (movie_id, person_id) pairs.
+        """
+        return [(self.movie_ids[m], self.person_ids[q]) for m, q in path]
+
+    def person(self, person_id):
+        """
+        Returns a dictionary of name and birth for a person.
+        """
+        p = self.person_index[person_id]
+        return {"name": self.person_names[p], "birth": self.person_births[p]}
+
+    def movie(self, movie_id):
+        """
+        Returns a dictionary of title and year for a movie.
+        """
+        m = self.movie_index[movie_id]
+        return {"title": self.movie_titles[m], "year": self.movie_years[m]}
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the IMDb ids of every person with the given name.
+        """
+        return [self.person_ids[p] for p in self.names.get(name.lower(), [])]
+
+
+class Appendable():
+    """
+    Sequence made of a read-only base sequence followed by a list
+    of appended items.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = []
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i < len(self.base):
+            return self.base[i]
+        return self.extra[i - len(self.base)]
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.extra
+
+    def append(self, item):
+        self.extra.append(item)
+
+
+class AppendableIndex():
+    """
+    Mapping that layers added keys over a read-only base mapping
+    with a `get` method. For list-valued mappings such as `names`,
+    `setdefault` copies the base list before it is extended.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = {}
+
+    def get(self, key, default=None):
+        if key in self.extra:
+            return self.extra[key]
+        return self.base.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __setitem__(self, key, value):
+        self.extra[key] = value
+
+    def setdefault(self, key, default):
+        if key not in self.extra:
+            self.extra[key] = list(self.base.get(key, default))
+        return self.extra[key]
+
+
+def csr(n, sources, targets):
+    """
+    Groups the edges (sources[i], targets[i]) by source with a counting
+    sort, returning (offsets, neighbors) arrays for `n` source nodes.
+    Duplicate edges are collapsed so each neighbor list is a set.
+    """
+
+    # Count outgoing edges per source node
+    counts = array.array("q", bytes(8 * (n + 1)))
+    for s in sources:
+        counts[s + 1] += 1
+
+    # Prefix sums give the start of each node's slice
+    for i in range(n):
+        counts[i + 1] += counts[i]
+    offsets = array.array("q", counts)
+
+    # Scatter targets into their slices
+    neighbors = array.array("i", bytes(4 * len(sources)))
+    cursor = counts
+    for s, t in zip(sources, targets):
+        neighbors[cursor[s]] = t
+        cursor[s] += 1
+
+    # Collapse duplicate edges within each slice
+    unique = array.array("i")
+    start = 0
+    for i in range(n):
+        end = offsets[i + 1]
+        unique.extend(sorted(set(neighbors[start:end])))
+        offsets[i + 1] = len(unique)
+        start = end
+
+    return offsets, unique
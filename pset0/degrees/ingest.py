@@ -0,0 +1,250 @@
+import array
+import concurrent.futures
+import csv
+import os
+import sys
+import time
+
+from graph import CompactGraph
+
+# Rows parsed per chunk
+CHUNK_SIZE = 65536
+
+# Seconds between progress reports
+INTERVAL = 1.0
+
+# Id-to-index maps used by star parsing workers
+person_index = None
+movie_index = None
+
+
+class Progress():
+    """
+    Reports rows parsed and rows per second for one file on stderr,
+    at most once every `INTERVAL` seconds.
+    """
+
+    def __init__(self, label, enabled=True):
+        self.label = label
+        self.enabled = enabled
+        self.rows = 0
+        self.start = time.perf_counter()
+        self.reported = self.start
+
+    def update(self, rows):
+        self.rows += rows
+        now = time.perf_counter()
+        if self.enabled and now - self.reported >= INTERVAL:
+            self.reported = now
+            self.report(now)
+
+    def done(self, **counts):
+        """
+        Reports the final row count and any extra named counts.
+        """
+        if self.enabled:
+            self.report(time.perf_counter(), counts)
+
+    def report(self, now, counts=None):
+        rate = self.rows / max(now - self.start, 1e-9)
+        message = f"{self.label}: {self.rows:,} rows ({rate:,.0f} rows/s)"
+        for name, count in (counts or {}).items():
+            message += f", {count:,} {name.replace('_', ' ')}"
+        print(message, file=sys.stderr)
+
+
+def chunks(path, start=0, end=None, size=CHUNK_SIZE):
+    """
+    Yields lists of up to `size` row tuples from the CSV file at `path`,
+    skipping the header. With `start`/`end`, only the rows beginning in
+    that byte range are read, so a file can be split between workers.
+
+    Rows without quotes are split directly, which is much faster than
+    `csv.reader` for id-only files like stars.csv. Blank lines are
+    skipped.
+    """
+    with open(path, "rb") as f:
+        if start == 0:
+            f.readline()
+        else:
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+
+        chunk = []
+        for line in f:
+            if end is not None and position >= end:
+                break
+            position += len(line)
+            line = line.decode("utf-8").rstrip("\r\n")
+            if not line.strip():
+                # Skip blank lines, as csv.DictReader does
+                continue
+            if '"' in line:
+                chunk.append(tuple(next(csv.reader([line]))))
+            else:
+                chunk.append(tuple(line.split(",")))
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def shards(path, count):
+    """
+    Returns `count` (start, end) byte ranges covering the file at `path`.
+    """
+    length = os.path.getsize(path)
+    bounds = [length * i // count for i in range(count + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def read_people(directory, progress=False):
+    """
+    Returns parallel (ids, names, births) lists from people.csv.
+    """
+    ids, names, births = [], [], []
+    report = Progress("people.csv", progress)
+    for chunk in chunks(f"{directory}/people.csv"):
+        for person_id, name, birth in chunk:
+            ids.append(person_id)
+            names.append(name)
+            births.append(birth)
+        report.update(len(chunk))
+    report.done()
+    return ids, names, births
+
+
+def read_movies(directory, progress=False):
+    """
+    Returns parallel (ids, titles, years) lists from movies.csv.
+    """
+    ids, titles, years = [], [], []
+    report = Progress("movies.csv", progress)
+    for chunk in chunks(f"{directory}/movies.csv"):
+        for movie_id, title, year in chunk:
+            ids.append(movie_id)
+            titles.append(title)
+            years.append(year)
+        report.update(len(chunk))
+    report.done()
+    return ids, titles, years
+
+
+def read_stars(path, start=0, end=None, progress=False):
+    """
+    Returns (people, movies, dropped_people, dropped_movies) for the
+    star rows of `path` in a byte range: parallel index arrays of the
+    edges kept, and counts of rows dropped for referencing an unknown
+    person or movie. Uses the module-level id-to-index maps.
+    """
+    people = array.array("i")
+    movies = array.array("i")
+    dropped_people = 0
+    dropped_movies = 0
+    report = Progress("stars.csv", progress)
+    for chunk in chunks(path, start, end):
+        for person_id, movie_id in chunk:
+            p = person_index.get(person_id)
+            m = movie_index.get(movie_id)
+            if p is None:
+                dropped_people += 1
+            elif m is None:
+                dropped_movies += 1
+            else:
+                people.append(p)
+                movies.append(m)
+        report.update(len(chunk))
+    return people, movies, dropped_people, dropped_movies
+
+
+def init_worker(people, movies):
+    """
+    Installs the id-to-index maps in a worker that did not inherit them.
+    """
+    global person_index, movie_index
+    if person_index is None:
+        person_index = people
+        movie_index = movies
+
+
+def build_graph(directory, processes=1, progress=False):
+    """
+    Build a `CompactGraph` by streaming the CSV files in `directory`.
+
+    With `processes` > 1, people.csv and movies.csv are parsed in
+    parallel, then stars.csv is split into byte ranges parsed by
+    separate workers and the resulting edge arrays are concatenated.
+    Only integer edge arrays are kept for stars, never parsed rows.
+    """
+    global person_index, movie_index
+    graph = CompactGraph()
+
+    # Parse people and movies, in parallel if requested
+    if processes > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as pool:
+            people = pool.submit(read_people, directory, progress)
+            movies = pool.submit(read_movies, directory, progress)
+            people, movies = people.result(), movies.result()
+    else:
+        people = read_people(directory, progress)
+        movies = read_movies(directory, progress)
+    for person_id, name, birth in zip(*people):
+        graph.add_person(person_id, name, birth)
+    for movie_id, title, year in zip(*movies):
+        graph.add_movie(movie_id, title, year)
+
+    # Parse stars, sharded across workers if requested
+    person_index, movie_index = graph.person_index, graph.movie_index
+    path = f"{directory}/stars.csv"
+    report = Progress("stars.csv", progress)
+    star_people = array.array("i")
+    star_movies = array.array("i")
+    dropped_people = dropped_movies = 0
+    try:
+        if processes > 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=init_worker,
+                initargs=(person_index, movie_index)
+            ) as pool:
+                results = [
+                    pool.submit(read_stars, path, start, end, False)
+                    for start, end in shards(path, processes)
+                ]
+                for result in concurrent.futures.as_completed(results):
+                    people, movies, no_person, no_movie = result.result()
+                    report.update(len(people) + no_person + no_movie)
+                    star_people.extend(people)
+                    star_movies.extend(movies)
+                    dropped_people += no_person
+                    dropped_movies += no_movie
+        else:
+            star_people, star_movies, dropped_people, dropped_movies = (
+                read_stars(path, progress=progress)
+            )
+            report.rows = len(star_people) + dropped_people + dropped_movies
+    finally:
+        person_index = movie_index = None
+    report.done(unknown_people=dropped_people, unknown_movies=dropped_movies)
+
+    graph.set_stars(star_people, star_movies)
+    graph.dropped = {"people": dropped_people, "movies": dropped_movies}
+    return graph
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python ingest.py directory [processes]")
+    processes = int(sys.argv[2]) if len(sys.argv) == 3 else 1
+    start = time.perf_counter()
+    graph = build_graph(sys.argv[1], processes, progress=True)
+    print(f"Loaded {graph.num_people():,} people, "
+          f"{graph.num_movies():,} movies and "
+          f"{len(graph.person_movies):,} stars "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import array
+import heapq
+import math
+import os
+import struct
+import sys
+
+from distances import path_from_parents, single_source
+from ingest import build_graph
+from snapshot import source_stamps
+
+# Identifies a landmark index file and its layout version
+MAGIC = b"DEGLMRK\0"
+VERSION = 1
+
+# Magic, version, number of landmarks, number of people, and the
+# (mtime_ns, size) stamps of the three source CSV files
+HEADER = struct.Struct("<8sIIq6q")
+
+# Default index filename, stored alongside the CSV files
+FILENAME = "degrees.landmarks"
+
+# Ways of choosing landmarks
+STRATEGIES = ("degree", "farthest")
+
+
+class LandmarkOracle():
+    """
+    Breadth-first distances from a few landmark people to everyone,
+    giving bounds on the degrees of separation of any pair of people.
+
+    By the triangle inequality, for every landmark l that reaches both
+    s and t, |d(l, s) - d(l, t)| <= d(s, t) <= d(l, s) + d(l, t).
+    """
+
+    def __init__(self, graph, landmarks, tables):
+        self.graph = graph
+        self.landmarks = landmarks
+
+        # One (distance, parent, parent_movie) triple of arrays per landmark
+        self.tables = tables
+
+        # Graph version the tables were computed for
+        self.version = graph.version
+
+    @classmethod
+    def build(cls, graph, count=16, strategy="farthest"):
+        """
+        Choose up to `count` landmarks and search from each of them.
+
+        The "degree" strategy takes the people with the most co-stars.
+        The "farthest" strategy starts from the person with the most
+        co-stars and repeatedly adds the person farthest from every
+        landmark chosen so far, spreading landmarks across the graph.
+        """
+        if strategy not in STRATEGIES:
+            raise Exception(f"unknown landmark strategy {strategy}")
+        count = min(count, graph.num_people())
+        people = range(graph.num_people())
+        if count <= 0:
+            return cls(graph, array.array("i"), [])
+
+        if strategy == "degree":
+            landmarks = heapq.nlargest(
+                count, people, key=lambda p: costars(graph, p)
+            )
+            tables = [single_source(graph, landmark) for landmark in landmarks]
+            return cls(graph, array.array("i", landmarks), tables)
+
+        landmarks = [max(people, key=lambda p: costars(graph, p))]
+        tables = [single_source(graph, landmarks[0])]
+        nearest = array.array("i", tables[0][0])
+        while len(landmarks) < count:
+            farthest = max(people, key=nearest.__getitem__)
+            if nearest[farthest] <= 0:
+                break
+            landmarks.append(farthest)
+            tables.append(single_source(graph, farthest))
+            distance = tables[-1][0]
+            for p in people:
+                if 0 <= distance[p] < nearest[p]:
+                    nearest[p] = distance[p]
+        return cls(graph, array.array("i", landmarks), tables)
+
+    def stale(self):
+        """
+        Returns True if the graph has changed since the tables were
+        computed, so the bounds can no longer be trusted.
+        """
+        return self.version != self.graph.version
+
+    def bounds(self, s, t):
+        """
+        Returns (lower, upper) bounds on the degrees of separation of
+        person indices `s` and `t`. Both are `math.inf` if a landmark
+        reaches only one of them, as they are then not connected.
+        """
+        lower, upper = 0, math.inf
+        for distance, _, _ in self.tables:
+            ds = distance[s]
+            dt = distance[t]
+            if ds < 0 and dt < 0:
+                continue
+            if ds < 0 or dt < 0:
+                return math.inf, math.inf
+            lower = max(lower, abs(ds - dt))
+            upper = min(upper, ds + dt)
+        return lower, upper
+
+    def route(self, s, t):
+        """
+        Returns the list of (movie, person) index pairs from `s` to `t`
+        through the landmark giving the best upper bound, or None if no
+        landmark reaches both.
+        """
+        best = None
+        for landmark, (distance, parent, parent_movie) in zip(
+            self.landmarks, self.tables
+        ):
+            if distance[s] >= 0 and distance[t] >= 0:
+                if best is None or distance[s] + distance[t] < best[0]:
+                    best = (distance[s] + distance[t], landmark, parent,
+                            parent_movie)
+        if best is None:
+            return None
+        _, landmark, parent, parent_movie = best
+
+        # Walk the landmark's path to s backwards, then its path to t
+        to_source = path_from_parents(parent, parent_movie, s)
+        states = [landmark] + [p for _, p in to_source]
+        path = [(to_source[i][0], states[i])
+                for i in range(len(to_source) - 1, -1, -1)]
+        return path + path_from_parents(parent, parent_movie, t)
+
+    def search(self, source, target, neighbors_for, stats, exact=True):
+        """
+        Returns the shortest list of (action, state) pairs from `source`
+        to `target` by A* search, estimating the remaining distance from
+        each state by its landmark lower bound (ALT), and counting the
+        expanded states in `stats`.
+
+        When the bounds for the pair already meet, the route through the
+        best landmark is a shortest path and no search is needed. When a
+        landmark shows the pair is disconnected, returns None at once.
+
+        If `exact` is False, `neighbors_for` follows only part of the
+        graph, so distances may be longer than the tables say. Lower
+        bounds still hold and guide the search, but upper bounds and
+        landmark routes are not used.
+        """
+        stats["expanded"] = 0
+        if source == target:
+            return []
+        lower, upper = self.bounds(source, target)
+        if lower == math.inf:
+            return None
+        if not exact:
+            upper = math.inf
+        if lower == upper:
+            return self.route(source, target)
+
+        # Frontier of (estimate, -depth, insertion order, state) entries,
+        # preferring the deepest of equally promising states
+        depth = {source: 0}
+        parents = {source: None}
+        explored = set()
+        frontier = [(lower, 0, 0, source)]
+        pushed = 0
+        while frontier:
+            estimate, _, _, state = heapq.heappop(frontier)
+            if state in explored:
+                continue
+
+            # No path is shorter than the smallest estimate left, so once
+            # that meets the upper bound the landmark route is shortest
+            if estimate >= upper:
+                return self.route(source, target)
+            if state == target:
+                path = []
+                while parents[state] is not None:
+                    previous, action = parents[state]
+                    path.append((action, state))
+                    state = previous
+                path.reverse()
+                return path
+            explored.add(state)
+            stats["expanded"] += 1
+            for action, neighbor in neighbors_for(state):
+                if neighbor in depth and depth[neighbor] <= depth[state] + 1:
+                    continue
+                depth[neighbor] = depth[state] + 1
+                parents[neighbor] = (state, action)
+                pushed += 1
+                estimate = depth[neighbor] + self.bounds(neighbor, target)[0]
+                heapq.heappush(frontier, (
+                    estimate, -depth[neighbor], pushed, neighbor
+                ))
+        return None
+
+    def save(self, directory, path=None):
+        """
+        Write the landmarks and their tables to a binary file, stamped
+        with the modification times of the CSV files in `directory`.
+        """
+        path = path or landmarks_path(directory)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION, len(self.landmarks), self.graph.num_people(),
+                *source_stamps(directory)
+            ))
+            self.landmarks.tofile(f)
+            for table in self.tables:
+                for column in table:
+                    column.tofile(f)
+
+    @classmethod
+    def load(cls, graph, directory, path=None):
+        """
+        Read tables written by `save` for `graph`. Returns None if the
+        file is missing, truncated, from another layout version, or out
+        of date with the CSV files or the number of people in `graph`.
+        """
+        path = path or landmarks_path(directory)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            try:
+                magic, version, count, people, *stamps = HEADER.unpack(
+                    f.read(HEADER.size)
+                )
+                if (magic != MAGIC or version != VERSION
+                        or people != graph.num_people()
+                        or stamps != source_stamps(directory)):
+                    return None
+                landmarks = array.array("i")
+                landmarks.fromfile(f, count)
+                tables = []
+                for _ in range(count):
+                    table = []
+                    for _ in range(3):
+                        column = array.array("i")
+                        column.fromfile(f, people)
+                        table.append(column)
+                    tables.append(tuple(table))
+            except (struct.error, EOFError):
+                return None
+        return cls(graph, landmarks, tables)
+
+
+def costars(graph, p):
+    """
+    Returns the number of co-star slots of person index `p`, counting
+    the full cast of each of their movies.
+    """
+    return sum(len(graph.stars_of(m)) for m in graph.movies_of(p))
+
+
+def landmarks_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def load(graph, directory, count=16, strategy="farthest", path=None):
+    """
+    Returns the landmark oracle for `graph` loaded from disk, building
+    it with `count` landmarks chosen by `strategy` and saving it first
+    if it is missing or out of date.
+    """
+    oracle = LandmarkOracle.load(graph, directory, path)
+    # Tables on disk describe the CSV files, not stars added since
+    if oracle is None or graph.has_overlay():
+        oracle = LandmarkOracle.build(graph, count, strategy)
+        if not graph.has_overlay():
+            oracle.save(directory, path)
+    return oracle
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python landmarks.py directory [count] [strategy]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) >= 3 else 16
+    strategy = sys.argv[3] if len(sys.argv) == 4 else "farthest"
+    if strategy not in STRATEGIES:
+        sys.exit(f"Strategy must be one of: {', '.join(STRATEGIES)}")
+
+    print("Loading data...")
+    graph = build_graph(directory, progress=True)
+    oracle = LandmarkOracle.build(graph, count, strategy)
+    oracle.save(directory)
+    print(f"Wrote {landmarks_path(directory)}: "
+          f"{len(oracle.landmarks)} landmarks.")
+    for landmark in oracle.landmarks:
+        print(f"  {graph.person_names[landmark]} "
+              f"({graph.person_ids[landmark]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import array
+import bisect
+import collections
+import heapq
+import re
+
+from snapshot import StringTable
+
+# Most candidates scored exactly per fuzzy query
+CANDIDATES = 50
+
+# Most posting entries counted per fuzzy query, bounding its time when
+# even the rarest trigrams of the query are common
+HIT_BUDGET = 2000
+
+# Trailing birth year in a query, e.g. "Kevin Bacon 1958" or "(1958)"
+YEAR = re.compile(r"\s*\(?(\d{4})\)?\s*$")
+
+
+class NameIndex():
+    """
+    Prefix and trigram index over person names for autocomplete and
+    typo-tolerant lookup.
+
+    Distinct lowercase names are packed into a sorted `StringTable`, so a
+    prefix is one binary search. Each name's people are stored in CSR
+    form, and each trigram maps to an array of name numbers, so memory
+    grows with packed arrays rather than Python objects per person.
+    """
+
+    def __init__(self, person_ids, names, births):
+        """
+        Build the index over parallel sequences of person ids, names and
+        birth years, such as the columns of a `CompactGraph`.
+        """
+        self.person_ids = person_ids
+        self.names = names
+        self.births = births
+
+        # Group people by normalized name, in name order
+        order = sorted(range(len(names)), key=lambda p: normalize(names[p]))
+        keys = []
+        self.offsets = array.array("q", [0])
+        self.people = array.array("i")
+        for p in order:
+            key = normalize(names[p])
+            if not keys or keys[-1] != key:
+                keys.append(key)
+                self.offsets.append(self.offsets[-1])
+            self.people.append(p)
+            self.offsets[-1] += 1
+        self.keys = StringTable(*StringTable.pack(keys))
+
+        # Posting list of name numbers and trigram count for each name
+        self.postings = {}
+        self.sizes = array.array("H")
+        for k, key in enumerate(keys):
+            grams = trigrams(key)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array.array("i")
+                posting.append(k)
+
+    def people_for(self, k):
+        """
+        Returns the person positions sharing name number `k`.
+        """
+        return self.people[self.offsets[k]:self.offsets[k + 1]]
+
+    def prefix(self, query, limit=10):
+        """
+        Returns up to `limit` name numbers starting with `query`,
+        in alphabetical order.
+        """
+        query = normalize(query)
+        k = bisect.bisect_left(self.keys, query)
+        matches = []
+        while k < len(self.keys) and len(matches) < limit:
+            if not self.keys[k].startswith(query):
+                break
+            matches.append(k)
+            k += 1
+        return matches
+
+    def fuzzy(self, query, limit=10):
+        """
+        Returns up to `limit` (score, name number) pairs ranked by
+        trigram similarity to `query`, best first.
+
+        Candidates are gathered from the rarer half of the query's
+        trigrams, which tolerates a typo while skipping the huge posting
+        lists of common trigrams, then scored by Jaccard similarity. At
+        most HIT_BUDGET posting entries are counted.
+        """
+        grams = trigrams(normalize(query))
+        postings = sorted(
+            (self.postings[gram] for gram in grams if gram in self.postings),
+            key=len
+        )
+        if not postings:
+            return []
+
+        # Count trigram hits for names in the rarest postings
+        hits = collections.Counter()
+        budget = HIT_BUDGET
+        for posting in postings[:len(postings) // 2 + 1]:
+            if budget <= 0:
+                break
+            if len(posting) > budget:
+                posting = posting[:budget]
+            budget -= len(posting)
+            hits.update(posting)
+
+        # Names sharing a single trigram are only candidates if no name
+        # shares more, which skips ranking most of the hits
+        least = min(2, max(hits.values()))
+        candidates = [k for k, count in hits.items() if count >= least]
+        if len(candidates) > CANDIDATES:
+            candidates = heapq.nlargest(
+                CANDIDATES, candidates, key=hits.__getitem__
+            )
+
+        # Score candidates by exact trigram overlap
+        scored = []
+        for k in candidates:
+            common = len(grams & trigrams(self.keys[k]))
+            score = common / (len(grams) + self.sizes[k] - common)
+            scored.append((score, k))
+        return heapq.nlargest(limit, scored)
+
+    def search(self, query, limit=10):
+        """
+        Returns up to `limit` ranked candidate people for a name query,
+        as dictionaries of id, name, birth and score.
+
+        Exact matches rank first, then prefix matches, then fuzzy
+        matches, which are only looked for when there are fewer than
+        `limit` prefix matches. A trailing birth year in the query, as in
+        "Kevin Bacon 1958", ranks people born that year ahead of the rest.
+        """
+        match = YEAR.search(query)
+        year = None
+        if match and match.start() > 0:
+            year = match.group(1)
+            query = query[:match.start()]
+        query = normalize(query)
+
+        # Rank name numbers: exact, then prefix, then fuzzy
+        ranked = {}
+        for k in self.prefix(query, limit):
+            ranked[k] = 1.0 if self.keys[k] == query else 0.9
+        if len(ranked) < limit:
+            for score, k in self.fuzzy(query, limit):
+                ranked.setdefault(k, 0.8 * score)
+
+        # Expand names to people, preferring a matching birth year
+        results = []
+        for k, score in ranked.items():
+            for p in self.people_for(k):
+                birth = self.births[p]
+                results.append({
+                    "id": self.person_ids[p],
+                    "name": self.names[p],
+                    "birth": birth,
+                    "score": round(score, 3),
+                    "year": year is not None and birth == year
+                })
+        results.sort(key=lambda r: (r["year"], r["score"]), reverse=True)
+        for result in results:
+            del result["year"]
+        return results[:limit]
+
+
+def normalize(name):
+    return " ".join(name.lower().split())
+
+
+def trigrams(text):
+    """
+    Returns the set of trigrams of `text`, padded so that the start
+    and end of the text form trigrams of their own.
+    """
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
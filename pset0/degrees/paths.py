@@ -0,0 +1,148 @@
+def distances_to(target, neighbors_for, horizon=None):
+    """
+    Returns a dictionary of breadth-first distances from every state
+    within `horizon` steps of `target` (every reachable state if None).
+
+    The graph is assumed to be undirected, so these are also the
+    distances from each state to `target`.
+    """
+    distance = {target: 0}
+    frontier = [target]
+    depth = 0
+    while frontier and (horizon is None or depth < horizon):
+        depth += 1
+        next_frontier = []
+        for state in frontier:
+            for _, neighbor in neighbors_for(state):
+                if neighbor not in distance:
+                    distance[neighbor] = depth
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distance
+
+
+def all_shortest_paths(source, target, neighbors_for):
+    """
+    Lazily yields every shortest list of (action, state) pairs from
+    `source` to `target`.
+
+    One breadth-first pass from the target labels each state with its
+    distance, stopping at the source's layer. Paths are then enumerated
+    depth-first along the layered DAG of steps that bring the distance
+    down by one, so each path costs only its own length.
+    """
+    if source == target:
+        yield []
+        return
+
+    # Distances to the target, out to the source's layer only
+    distance = {target: 0}
+    frontier = [target]
+    depth = 0
+    while frontier and source not in distance:
+        depth += 1
+        next_frontier = []
+        for state in frontier:
+            for _, neighbor in neighbors_for(state):
+                if neighbor not in distance:
+                    distance[neighbor] = depth
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    if source not in distance:
+        return
+
+    # Walk the DAG of distance-decreasing steps from the source
+    path = []
+    stack = [iter(downhill(source, distance, neighbors_for))]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        path.append(step)
+        if step[1] == target:
+            yield list(path)
+            path.pop()
+        else:
+            stack.append(iter(downhill(step[1], distance, neighbors_for)))
+
+
+def downhill(state, distance, neighbors_for):
+    """
+    Returns the (action, state) steps from `state` one closer to the
+    target, in a stable order.
+    """
+    closer = distance[state] - 1
+    return sorted(
+        (action, neighbor) for action, neighbor in neighbors_for(state)
+        if distance.get(neighbor) == closer
+    )
+
+
+def simple_paths(source, target, neighbors_for, max_length=None):
+    """
+    Lazily yields simple paths (no state visited twice) from `source`
+    to `target` as lists of (action, state) pairs, shortest first.
+    Take the first k with `itertools.islice` for the k shortest paths.
+
+    A single breadth-first pass from the target gives every state's
+    distance to it. Paths of each length L are then enumerated by a
+    depth-first search that prunes any state that cannot reach the
+    target within the remaining L - depth steps, so BFS is never rerun
+    and enumeration stops as soon as the caller does.
+    """
+    distance = distances_to(target, neighbors_for)
+    if source not in distance:
+        return
+    if source == target:
+        yield []
+        return
+
+    # Every simple path is shorter than the number of reachable states
+    longest = len(distance) - 1
+    if max_length is not None:
+        longest = min(longest, max_length)
+
+    for length in range(distance[source], longest + 1):
+        yield from paths_of_length(
+            source, target, length, distance, neighbors_for
+        )
+
+
+def paths_of_length(source, target, length, distance, neighbors_for):
+    """
+    Yields the simple paths from `source` to `target` with exactly
+    `length` steps, pruned by distances to the target. A step never
+    takes the same action as the step before it, since two people who
+    shared that action are already one step apart.
+    """
+    path = []
+    visited = {source}
+
+    def steps(state, depth):
+        remaining = length - depth - 1
+        previous = path[-1][0] if path else None
+        return iter(sorted(
+            (action, neighbor) for action, neighbor in neighbors_for(state)
+            if neighbor not in visited
+            and action != previous
+            and distance.get(neighbor, remaining + 1) <= remaining
+            and (neighbor != target or remaining == 0)
+        ))
+
+    stack = [steps(source, 0)]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            if path:
+                visited.discard(path.pop()[1])
+            continue
+        if step[1] == target:
+            yield path + [step]
+            continue
+        path.append(step)
+        visited.add(step[1])
+        stack.append(steps(step[1], len(path)))
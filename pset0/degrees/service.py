@@ -0,0 +1,272 @@
+import argparse
+import collections
+import concurrent.futures
+import json
+import sys
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees of separation queries."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="load an integer-indexed CSR graph")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="memory-map the compact graph from a snapshot")
+    parser.add_argument("--mode", choices=sorted(degrees.SEARCHES),
+                        default="bidirectional",
+                        help="search strategy (default: bidirectional)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes (default: search in-process)")
+    parser.add_argument("--cache", type=int, default=0, metavar="PAIRS",
+                        help="cache up to PAIRS neighbor pairs (default: off)")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="suggest similar names and serve /suggest")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--batch", metavar="FILE",
+                        help="read tab-separated name pairs, - for stdin")
+    action.add_argument("--serve", metavar="PORT", type=int,
+                        help="answer HTTP queries on PORT")
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+
+    # Load data once; forked workers inherit it
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, args.compact, args.snapshot)
+    degrees.enable_neighbor_cache(args.cache)
+    if args.fuzzy:
+        degrees.build_name_index()
+    print("Data loaded.", file=sys.stderr)
+
+    pool = None
+    if args.workers > 0:
+        pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=init_worker,
+            initargs=(args.directory, args.compact, args.snapshot,
+                      args.cache)
+        )
+
+    try:
+        if args.batch is not None:
+            if args.batch == "-":
+                run_batch(sys.stdin, sys.stdout, args.mode, pool,
+                          4 * args.workers)
+            else:
+                with open(args.batch, encoding="utf-8") as f:
+                    run_batch(f, sys.stdout, args.mode, pool,
+                              4 * args.workers)
+        else:
+            serve(args.host, args.serve, args.mode, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def init_worker(directory, compact, snapshot, cache):
+    """
+    Load data in a worker process, unless it was inherited by fork,
+    and give the worker its own neighbor cache.
+    """
+    if degrees.graph is None and not degrees.people:
+        degrees.load_data(directory, compact, snapshot)
+    degrees.enable_neighbor_cache(cache)
+
+
+def resolve(name):
+    """
+    Returns (person_id, error) for a name without prompting.
+
+    A name shared by several people is an error listing the candidates;
+    any of their ids may be passed in place of the name instead.
+    """
+    person_ids = degrees.person_ids_for_name(name)
+    if len(person_ids) == 1:
+        return person_ids[0], None
+    if len(person_ids) > 1:
+        candidates = []
+        for person_id in person_ids:
+            person = degrees.person_for_id(person_id)
+            candidates.append({
+                "id": person_id,
+                "name": person["name"],
+                "birth": person["birth"]
+            })
+        return None, {"error": "Ambiguous name.", "name": name,
+                      "candidates": candidates}
+    if degrees.has_person(name):
+        return name, None
+    error = {"error": "Person not found.", "name": name}
+    if degrees.name_index is not None:
+        error["suggestions"] = degrees.name_index.search(name, limit=5)
+    return None, error
+
+
+def query(source, target, mode="bidirectional"):
+    """
+    Returns a JSON-serializable dictionary answering one query
+    between the people named `source` and `target`.
+    """
+    result = {"source": source, "target": target}
+
+    # Resolve both names to ids
+    source_id, error = resolve(source)
+    if error is None:
+        target_id, error = resolve(target)
+    if error is not None:
+        result.update(error)
+        return result
+
+    path = degrees.shortest_path(source_id, target_id, mode)
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+        return result
+
+    # Describe each step of the path
+    result["degrees"] = len(path)
+    result["path"] = []
+    for movie_id, person_id in path:
+        result["path"].append({
+            "movie_id": movie_id,
+            "title": degrees.movie_for_id(movie_id)["title"],
+            "person_id": person_id,
+            "name": degrees.person_for_id(person_id)["name"]
+        })
+    return result
+
+
+def parse_pairs(lines):
+    """
+    Yields (source, target) name pairs from tab-separated lines,
+    skipping blank lines and # comments. Malformed lines are yielded
+    as (line, None) so they are reported rather than dropped.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = [field.strip() for field in line.split("\t")]
+        if len(fields) == 2:
+            yield fields[0], fields[1]
+        else:
+            yield line, None
+
+
+def answer(source, target, mode):
+    if target is None:
+        return {"error": "Expected two tab-separated names.", "line": source}
+    return query(source, target, mode)
+
+
+def run_batch(lines, out, mode, pool=None, window=64):
+    """
+    Answer every name pair in `lines`, writing one JSON object per line
+    to `out` in input order as soon as each result is ready.
+
+    With a `pool`, at most `window` queries are in flight at once, so
+    the input is streamed rather than read up front.
+    """
+    if pool is None:
+        for source, target in parse_pairs(lines):
+            out.write(json.dumps(answer(source, target, mode)) + "\n")
+        return
+
+    # Keep a bounded window of queries in flight
+    pending = collections.deque()
+    for source, target in parse_pairs(lines):
+        pending.append(pool.submit(answer, source, target, mode))
+        if len(pending) >= window:
+            out.write(json.dumps(pending.popleft().result()) + "\n")
+    while pending:
+        out.write(json.dumps(pending.popleft().result()) + "\n")
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Answers `GET /path?source=NAME&target=NAME[&mode=MODE]` with the
+    JSON result of `query`, `GET /suggest?q=TEXT[&limit=N]` with ranked
+    name candidates, and `GET /health` with a status object.
+    """
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(url.query)
+
+        if url.path == "/health":
+            status = {"status": "ok"}
+            if degrees.neighbor_cache is not None:
+                status["cache"] = degrees.neighbor_cache.info()
+            return self.send_json(200, status)
+        if url.path == "/suggest":
+            return self.suggest(params)
+        if url.path != "/path":
+            return self.send_json(404, {"error": "Not found."})
+
+        source = params.get("source", [None])[0]
+        target = params.get("target", [None])[0]
+        mode = params.get("mode", [self.server.mode])[0]
+        if source is None or target is None:
+            return self.send_json(
+                400, {"error": "Expected source and target parameters."}
+            )
+        if mode not in degrees.SEARCHES:
+            return self.send_json(400, {"error": f"Unknown mode {mode}."})
+
+        if self.server.pool is None:
+            result = query(source, target, mode)
+        else:
+            result = self.server.pool.submit(
+                query, source, target, mode
+            ).result()
+        self.send_json(200, result)
+
+    def suggest(self, params):
+        if degrees.name_index is None:
+            return self.send_json(
+                404, {"error": "Name index not built, run with --fuzzy."}
+            )
+        text = params.get("q", [""])[0]
+        try:
+            limit = int(params.get("limit", ["10"])[0])
+        except ValueError:
+            return self.send_json(400, {"error": "Expected integer limit."})
+        self.send_json(200, {
+            "query": text,
+            "candidates": degrees.name_index.search(text, limit)
+        })
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(host, port, mode, pool=None):
+    """
+    Serve queries over HTTP until interrupted, keeping the graph
+    resident. Each connection gets a thread; searches run in `pool`
+    when one is given.
+    """
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.mode = mode
+    server.pool = pool
+    print(f"Serving on http://{host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
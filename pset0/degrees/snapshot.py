@@ -0,0 +1,300 @@
+import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+
+from graph import CompactGraph
+from ingest import build_graph
+
+# Identifies a degrees snapshot file and its layout version
+MAGIC = b"DEGSNAP\0"
+VERSION = 2
+
+# Default snapshot filename, stored alongside the CSV files
+FILENAME = "degrees.snapshot"
+
+# CSV files whose modification times invalidate a snapshot
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Magic, version, section count, then (mtime_ns, size) per source file
+HEADER = struct.Struct(f"<8sII{2 * len(SOURCES)}q")
+
+# Section name, array typecode, byte offset and number of items
+SECTION = struct.Struct("<24sc7xqq")
+
+# Integer arrays copied directly from the graph
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_stars")
+
+# String lists stored as (offsets, utf-8 blob) pairs
+TABLES = ("person_ids", "person_names", "person_births",
+          "movie_ids", "movie_titles", "movie_years")
+
+
+class StringTable():
+    """
+    Read-only sequence of strings packed into one utf-8 blob, where
+    string `i` is `blob[offsets[i]:offsets[i + 1]]`.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def pack(cls, strings):
+        """
+        Returns (offsets, blob) arrays for a list of strings.
+        """
+        offsets = array.array("q", [0])
+        blob = bytearray()
+        for s in strings:
+            blob += s.encode("utf-8")
+            offsets.append(len(blob))
+        return offsets, array.array("B", blob)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SortedIndex():
+    """
+    Read-only mapping from strings to indices, answered by binary search
+    over `order`, a permutation of `table` sorted by `normalize(string)`.
+
+    If `unique` is False, lookups return the list of all matching
+    indices, mirroring a dictionary of lists.
+    """
+
+    def __init__(self, table, order, normalize=None, unique=True):
+        self.table = table
+        self.order = order
+        self.normalize = normalize
+        self.unique = unique
+
+    @classmethod
+    def sort(cls, strings, normalize=None):
+        """
+        Returns the `order` array that sorts a list of strings.
+        """
+        if normalize is None:
+            keys = strings
+        else:
+            keys = [normalize(s) for s in strings]
+        return array.array("i", sorted(range(len(keys)), key=keys.__getitem__))
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        keys = SortedKeys(self)
+        lo = bisect.bisect_left(keys, key)
+        hi = bisect.bisect_right(keys, key, lo)
+        if lo == hi:
+            return default
+        if self.unique:
+            return self.order[lo]
+        return [self.order[k] for k in range(lo, hi)]
+
+
+class SortedKeys():
+    """
+    Sequence view of the normalized keys of a `SortedIndex`
+    in sorted order, so the index can be searched with `bisect`.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index.order)
+
+    def __getitem__(self, k):
+        index = self.index
+        key = index.table[index.order[k]]
+        return key if index.normalize is None else index.normalize(key)
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def source_stamps(directory):
+    """
+    Returns (mtime_ns, size) for each source CSV file in `directory`.
+    """
+    stamps = []
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stamps.extend((stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+
+def write(graph, directory, path=None):
+    """
+    Write `graph` to a versioned binary snapshot, stamped with the
+    modification times of the CSV files in `directory`.
+
+    Anything appended to the graph since it was loaded is merged into
+    its CSR arrays first, and so is included in the snapshot.
+    """
+    path = path or snapshot_path(directory)
+    if graph.has_overlay() or len(graph.person_offsets) - 1 != len(
+        graph.person_ids
+    ) or len(graph.movie_offsets) - 1 != len(graph.movie_ids):
+        graph.merge()
+
+    # Collect every section as a (name, array) pair
+    sections = [(name, getattr(graph, name)) for name in ARRAYS]
+    for name in TABLES:
+        offsets, blob = StringTable.pack(getattr(graph, name))
+        sections.append((f"{name}.offsets", offsets))
+        sections.append((f"{name}.blob", blob))
+    sections.append(("person_order", SortedIndex.sort(graph.person_ids)))
+    sections.append(("movie_order", SortedIndex.sort(graph.movie_ids)))
+    sections.append(("name_order",
+                     SortedIndex.sort(graph.person_names, str.lower)))
+    sections.append(("dropped", array.array(
+        "q", [graph.dropped["people"], graph.dropped["movies"]]
+    )))
+
+    # Lay out sections after the header, aligned to 8 bytes
+    offset = HEADER.size + SECTION.size * len(sections)
+    entries = []
+    for name, data in sections:
+        offset = align(offset)
+        entries.append(SECTION.pack(
+            name.encode(), data.typecode.encode(), offset, len(data)
+        ))
+        offset += len(data) * data.itemsize
+
+    # Write to a temporary file, then atomically replace any old snapshot
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, len(sections), *source_stamps(directory)
+        ))
+        for entry in entries:
+            f.write(entry)
+        for name, data in sections:
+            f.write(bytes(align(f.tell()) - f.tell()))
+            f.write(data.tobytes())
+    os.replace(temporary, path)
+
+
+def read(directory, path=None):
+    """
+    Memory-map a snapshot and return it as a `CompactGraph`.
+
+    Returns None if the snapshot is missing, was written by another
+    version, or is older than the CSV files in `directory`.
+    """
+    path = path or snapshot_path(directory)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    # Check the header against the current CSV files
+    view = memoryview(buffer)
+    try:
+        magic, version, count, *stamps = HEADER.unpack_from(view)
+    except struct.error:
+        magic = None
+    if (magic != MAGIC or version != VERSION
+            or stamps != source_stamps(directory)):
+        view.release()
+        buffer.close()
+        return None
+
+    # Map every section directly onto the file
+    sections = {}
+    for i in range(count):
+        name, typecode, offset, length = SECTION.unpack_from(
+            view, HEADER.size + i * SECTION.size
+        )
+        typecode = typecode.decode()
+        size = length * array.array(typecode).itemsize
+        sections[name.rstrip(b"\0").decode()] = (
+            view[offset:offset + size].cast(typecode)
+        )
+
+    graph = CompactGraph()
+    graph.snapshot = buffer
+    for name in ARRAYS:
+        setattr(graph, name, sections[name])
+    for name in TABLES:
+        setattr(graph, name, StringTable(
+            sections[f"{name}.offsets"], sections[f"{name}.blob"]
+        ))
+    graph.person_index = SortedIndex(
+        graph.person_ids, sections["person_order"]
+    )
+    graph.movie_index = SortedIndex(
+        graph.movie_ids, sections["movie_order"]
+    )
+    graph.names = SortedIndex(
+        graph.person_names, sections["name_order"], str.lower, unique=False
+    )
+    dropped_people, dropped_movies = sections["dropped"]
+    graph.dropped = {"people": dropped_people, "movies": dropped_movies}
+    return graph
+
+
+def load(directory, path=None, processes=1, progress=False):
+    """
+    Returns the graph for `directory`, memory-mapped from its snapshot
+    when that is current, otherwise parsed from CSV and snapshotted.
+    If the snapshot cannot be written, the parsed graph is returned.
+    """
+    graph = read(directory, path)
+    if graph is None:
+        graph = build_graph(directory, processes, progress)
+        try:
+            write(graph, directory, path)
+        except OSError as e:
+            print(f"Could not write snapshot: {e}", file=sys.stderr)
+            return graph
+        graph = read(directory, path) or graph
+    return graph
+
+
+def align(offset):
+    return (offset + 7) & ~7
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python snapshot.py directory [snapshot]")
+    directory = sys.argv[1]
+    path = sys.argv[2] if len(sys.argv) == 3 else None
+
+    print("Loading data...")
+    graph = build_graph(directory, progress=True)
+    write(graph, directory, path)
+    print(f"Wrote {path or snapshot_path(directory)}: "
+          f"{graph.num_people()} people, {graph.num_movies()} movies.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import array
+import bisect
+
+# Year recorded for movies whose year is missing or not a number
+UNKNOWN = -1
+
+
+class YearIndex():
+    """
+    Each person's movies in order of release year, so the movies of one
+    person within a range of years are found by binary search instead
+    of by checking every movie.
+
+    The index is a second CSR adjacency from people to movies, sharing
+    its layout with `CompactGraph`, with a parallel array of years.
+    Stars added to the graph later are not seen, see `stale`.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.version = graph.version
+
+        n = graph.num_people()
+        years = array.array("i", map(parse_year, graph.movie_years))
+
+        # Count movies per person, then prefix sums give slice starts
+        offsets = array.array("q", bytes(8 * (n + 1)))
+        for p in range(n):
+            offsets[p + 1] = offsets[p] + len(graph.movies_of(p))
+
+        # Scatter each movie's cast in year order, so slices end up sorted
+        movies = array.array("i", bytes(4 * offsets[n]))
+        cursor = array.array("q", offsets)
+        for m in sorted(range(graph.num_movies()), key=years.__getitem__):
+            for p in graph.stars_of(m):
+                movies[cursor[p]] = m
+                cursor[p] += 1
+
+        self.offsets = offsets
+        self.movies = movies
+        self.years = array.array("i", (years[m] for m in movies))
+
+    def stale(self):
+        """
+        Returns True if the graph has changed since the index was built.
+        """
+        return self.version != self.graph.version
+
+    def movies_between(self, p, first=None, last=None):
+        """
+        Returns the movie indices of person `p` released from year
+        `first` to year `last` inclusive, either of which may be None
+        for no bound. Movies of unknown year are only included when
+        there are no bounds.
+        """
+        start = self.offsets[p]
+        end = self.offsets[p + 1]
+        if first is None and last is not None:
+            first = 0
+        if first is not None:
+            start = bisect.bisect_left(self.years, first, start, end)
+        if last is not None:
+            end = bisect.bisect_right(self.years, last, start, end)
+        return self.movies[start:end]
+
+    def neighbors(self, p, first=None, last=None, allowed=None):
+        """
+        Returns (movie, person) index pairs for people who starred with
+        person `p` in a movie from `first` to `last`, for which
+        `allowed(movie)` is true if given.
+        """
+        stars_of = self.graph.stars_of
+        neighbors = []
+        for m in self.movies_between(p, first, last):
+            if allowed is None or allowed(m):
+                for q in stars_of(m):
+                    neighbors.append((m, q))
+        return neighbors
+
+
+def parse_year(year):
+    """
+    Returns a movie year as an int, or `UNKNOWN` if it is not a number.
+    """
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return UNKNOWN
@@ -0,0 +1,113 @@
+"""
+Background AI for the Tic Tac Toe runner
+
+Computes AI moves on a worker thread, so the pygame loop keeps drawing
+frames while the AI thinks, and speculatively computes the AI's reply
+to each move the user might make while the user is thinking.
+"""
+
+import concurrent.futures
+import threading
+
+import tictactoe as ttt
+
+
+class AIWorker():
+    """
+    Queue of AI move computations keyed by board.
+
+    Each game is a generation. Starting a new game bumps the generation,
+    cancelling computations that have not started and stopping any that
+    are running, so the worker is free for the new game and a late
+    answer for an old board is never played.
+    """
+
+    def __init__(self, k=None, strategy="alphabeta"):
+        self.k = k
+        self.strategy = strategy
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.futures = {}
+        self.speculated = None
+
+    def request(self, board):
+        """
+        Starts computing the AI's move on the board, unless it has
+        already been requested in this generation.
+        """
+        key = freeze(board)
+        with self.lock:
+            if key not in self.futures:
+                cancel = threading.Event()
+                future = self.executor.submit(
+                    ttt.minimax, board, self.strategy, True, self.k,
+                    ttt.DEFAULT_BUDGET, cancel
+                )
+                self.futures[key] = (self.generation, future, cancel)
+
+    def speculate(self, board):
+        """
+        Requests the AI's reply to every move the user can make on the
+        board, while waiting for the user to choose one. Does nothing if
+        the board is the one last speculated on.
+        """
+        key = freeze(board)
+        if key == self.speculated:
+            return
+        self.speculated = key
+        for action in sorted(ttt.actions(board)):
+            self.request(ttt.result(board, action))
+
+    def keep(self, board):
+        """
+        Cancels every computation except the one for the board, once
+        the user's move has made the others moot, stopping any that are
+        running.
+        """
+        key = freeze(board)
+        with self.lock:
+            for other, (_, future, cancel) in list(self.futures.items()):
+                if other != key:
+                    cancel.set()
+                    future.cancel()
+                    del self.futures[other]
+
+    def poll(self, board):
+        """
+        Returns the AI's move on the board if it has been computed in
+        this generation, or None if it is not ready.
+        """
+        with self.lock:
+            entry = self.futures.get(freeze(board))
+        if entry is None:
+            return None
+        generation, future, _ = entry
+        if generation != self.generation or not future.done():
+            return None
+        if future.cancelled():
+            return None
+        return future.result()
+
+    def reset(self):
+        """
+        Starts a new generation for a new game.
+        """
+        with self.lock:
+            self.generation += 1
+            for _, future, cancel in self.futures.values():
+                cancel.set()
+                future.cancel()
+            self.futures = {}
+            self.speculated = None
+
+    def shutdown(self):
+        self.reset()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def freeze(board):
+    """
+    Returns a hashable copy of the board.
+    """
+    return tuple(tuple(row) for row in board)
@@ -0,0 +1,185 @@
+"""
+Tic Tac Toe Player using bitboards
+
+Each player's marks are one 9-bit integer, with bit 3 * i + j set for
+cell (i, j). Functions take and return the same nested-list boards as
+tictactoe.py, so either module can be used as `ttt` by runner.py.
+"""
+
+from tictactoe import X, O, EMPTY
+
+# All nine cells occupied
+FULL = 0b111111111
+
+# Masks of the three cells in each row, column and diagonal
+WINS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# Transposition table mapping (x, o) bitboards to minimax scores
+table = {}
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return [[EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+
+
+def encode(board):
+    """
+    Returns the (x, o) bitboards of a nested-list board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def decode(x, o):
+    """
+    Returns the nested-list board of (x, o) bitboards.
+    """
+    board = initial_state()
+    for i in range(3):
+        for j in range(3):
+            if x >> (3 * i + j) & 1:
+                board[i][j] = X
+            elif o >> (3 * i + j) & 1:
+                board[i][j] = O
+    return board
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = encode(board)
+    return X if bin(x).count("1") == bin(o).count("1") else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = encode(board)
+    return {divmod(cell, 3) for cell in empty_cells(x | o)}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = encode(board)
+    i, j = action
+    move = 1 << (3 * i + j)
+    if not (0 <= i < 3 and 0 <= j < 3) or (x | o) & move:
+        raise Exception("Not a valid move!")
+    if bin(x).count("1") == bin(o).count("1"):
+        return decode(x | move, o)
+    return decode(x, o | move)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = encode(board)
+    if wins(x):
+        return X
+    if wins(o):
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = encode(board)
+    return wins(x) or wins(o) or x | o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = encode(board)
+    return 1 if wins(x) else -1 if wins(o) else 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+
+    Moves are tried in the order of `actions`, keeping the first with
+    the best score, so the result is the move tictactoe.minimax picks.
+    """
+    x, o = encode(board)
+    if wins(x) or wins(o) or x | o == FULL:
+        return None
+
+    x_turn = bin(x).count("1") == bin(o).count("1")
+    optimal = None
+    best = None
+    for i, j in actions(board):
+        move = 1 << (3 * i + j)
+        if x_turn:
+            value = score(x | move, o)
+        else:
+            value = score(x, o | move)
+        if best is None or (value > best if x_turn else value < best):
+            best = value
+            optimal = (i, j)
+    return optimal
+
+
+def score(x, o):
+    """
+    Returns the minimax score of the position with bitboards (x, o),
+    memoized in the transposition table.
+    """
+    key = (x, o)
+    value = table.get(key)
+    if value is not None:
+        return value
+
+    if wins(x):
+        value = 1
+    elif wins(o):
+        value = -1
+    elif x | o == FULL:
+        value = 0
+    elif bin(x).count("1") == bin(o).count("1"):
+        value = max(score(x | 1 << cell, o) for cell in empty_cells(x | o))
+    else:
+        value = min(score(x, o | 1 << cell) for cell in empty_cells(x | o))
+
+    table[key] = value
+    return value
+
+
+def wins(bits):
+    """
+    Returns True if the bitboard holds three in a row.
+    """
+    for mask in WINS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def empty_cells(occupied):
+    """
+    Returns the cell numbers 3 * i + j not set in `occupied`.
+    """
+    return [cell for cell in range(9) if not occupied >> cell & 1]
@@ -0,0 +1,92 @@
+"""
+Tic Tac Toe opening book generator
+
+Solves every position reachable from the empty board, reduced to one
+position per class of the 8 rotations and reflections, and writes the
+best move for each to a book that tictactoe.minimax looks moves up in.
+"""
+
+import sys
+
+import bitboard
+import tictactoe as ttt
+
+
+def solve():
+    """
+    Returns (book, positions): a dictionary mapping the code of each
+    canonical non-terminal position to its best cell 3 * i + j, and the
+    number of canonical positions reached, terminal ones included.
+    """
+    book = {}
+    seen = set()
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        code, index = ttt.canonical(board)
+        if code in seen:
+            continue
+        seen.add(code)
+        if ttt.terminal(board):
+            continue
+
+        # Solve the canonical orientation, so its cell needs no mapping
+        board = orient(board, ttt.SYMMETRIES[index])
+        book[code] = best_cell(board)
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+    return book, len(seen)
+
+
+def orient(board, symmetry):
+    """
+    Returns the board with each cell moved to where `symmetry` sends it.
+    """
+    oriented = ttt.initial_state()
+    for cell in range(9):
+        i, j = divmod(symmetry[cell], 3)
+        oriented[i][j] = board[cell // 3][cell % 3]
+    return oriented
+
+
+def best_cell(board):
+    """
+    Returns the cell of an optimal move on the board, preferring
+    immediate wins, then blocks, then center, corners and edges.
+    """
+    x, o = bitboard.encode(board)
+    target = bitboard.score(x, o)
+    x_turn = ttt.player(board) == ttt.X
+    for i, j in ttt.ordered_actions(board):
+        move = 1 << (3 * i + j)
+        if x_turn:
+            value = bitboard.score(x | move, o)
+        else:
+            value = bitboard.score(x, o | move)
+        if value == target:
+            return 3 * i + j
+
+
+def write(book, path=ttt.BOOK_PATH):
+    """
+    Writes the book as fixed-size records sorted by position code.
+    """
+    with open(path, "wb") as f:
+        for code in sorted(book):
+            f.write(ttt.BOOK_RECORD.pack(code, book[code]))
+
+
+def main():
+    if len(sys.argv) not in (1, 2):
+        sys.exit("Usage: python book.py [book]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_PATH
+
+    book, positions = solve()
+    write(book, path)
+    print(f"Solved {positions} positions up to symmetry.")
+    print(f"Wrote {path}: {len(book)} moves, "
+          f"{len(book) * ttt.BOOK_RECORD.size} bytes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Depth-limited search for m,n,k games
+
+Tic-tac-toe generalized to boards of any size with k in a row to win,
+where the game tree is too large to search to the end. Moves are made
+and undone in place, wins are detected around the last move only, and
+iterative deepening returns the best move found within a time budget,
+scoring unfinished positions with a heuristic.
+"""
+
+import time
+
+from tictactoe import X, O, EMPTY, player, terminal, wins_at
+
+# Score of a won position; each heuristic line is worth less than
+# 10 ** (k - 1), so evaluations stay far below it on practical boards
+WIN = 10 ** 12
+
+
+class Timeout(Exception):
+    """
+    Raised inside the search when the time budget runs out or the
+    search is cancelled.
+    """
+
+
+def search(board, k, budget, stats=None, max_depth=None, cancel=None):
+    """
+    Returns the best action (i, j) for the current player on a board
+    with `k` in a row to win, deepening the search one move at a time
+    until `budget` seconds pass, the result is certain, or `max_depth`
+    is reached. The number of boards visited is added to
+    `stats["nodes"]` if given.
+
+    `cancel` may be a `threading.Event`; once it is set, the search
+    stops as if the budget had run out.
+    """
+    if terminal(board, k):
+        return None
+    rows = len(board)
+    cols = len(board[0])
+    board = [list(row) for row in board]
+    mark = player(board)
+    empty = [(i, j) for i in range(rows) for j in range(cols)
+             if board[i][j] == EMPTY]
+    lines = windows(rows, cols, k)
+
+    state = {
+        "deadline": time.perf_counter() + budget,
+        "cancel": cancel,
+        "nodes": 0,
+        "k": k,
+        "lines": lines,
+    }
+
+    # The first ordered move stands in until a search depth completes
+    best = order(board, empty, None)[0]
+    depth = 0
+    while depth < len(empty) and (max_depth is None or depth < max_depth):
+        depth += 1
+        try:
+            value, move = root(board, empty, depth, mark, best, state)
+        except Timeout:
+            break
+        best = move
+
+        # A forced win or loss is found, deeper searches cannot change it
+        if abs(value) > WIN // 2:
+            break
+
+    if stats is not None:
+        stats["nodes"] += state["nodes"]
+    return best
+
+
+def root(board, empty, depth, mark, previous, state):
+    """
+    Searches every move to `depth`, the previous best first, and
+    returns (value, action) for the best one.
+    """
+    alpha = -WIN - 1
+    best = None
+    for i, j in order(board, empty, previous):
+        board[i][j] = mark
+        empty.remove((i, j))
+        try:
+            value = -negamax(board, empty, depth - 1, -WIN - 1, -alpha,
+                             other(mark), (i, j), 1, state)
+        finally:
+            board[i][j] = EMPTY
+            empty.append((i, j))
+        if best is None or value > alpha:
+            alpha = value
+            best = (i, j)
+    return alpha, best
+
+
+def negamax(board, empty, depth, alpha, beta, mark, last, ply, state):
+    """
+    Returns the value of the board for `mark`, the player to move, with
+    alpha-beta bounds, where `last` is the cell of the previous move.
+    """
+    state["nodes"] += 1
+    if time.perf_counter() > state["deadline"]:
+        raise Timeout
+    if state["cancel"] is not None and state["cancel"].is_set():
+        raise Timeout
+
+    # Only the previous move can have completed a line, so prefer
+    # quicker wins and slower losses by counting the ply
+    if wins_at(board, last[0], last[1], state["k"]):
+        return ply - WIN
+    if not empty:
+        return 0
+    if depth == 0:
+        return evaluate(board, mark, state["lines"])
+
+    value = -WIN - 1
+    for i, j in order(board, empty, None):
+        board[i][j] = mark
+        empty.remove((i, j))
+        try:
+            value = max(value, -negamax(board, empty, depth - 1, -beta,
+                                        -alpha, other(mark), (i, j),
+                                        ply + 1, state))
+        finally:
+            board[i][j] = EMPTY
+            empty.append((i, j))
+        if value >= beta:
+            return value
+        alpha = max(alpha, value)
+    return value
+
+
+def order(board, empty, first):
+    """
+    Returns the empty cells to try, `first` if given, then cells next to
+    existing marks before isolated ones, each nearest the center first.
+    """
+    rows = len(board)
+    cols = len(board[0])
+
+    def key(cell):
+        i, j = cell
+        neighbors = any(
+            board[a][b] != EMPTY
+            for a in range(max(0, i - 1), min(rows, i + 2))
+            for b in range(max(0, j - 1), min(cols, j + 2))
+        )
+        center = abs(2 * i - (rows - 1)) + abs(2 * j - (cols - 1))
+        return (cell != first, not neighbors, center, cell)
+    return sorted(empty, key=key)
+
+
+def evaluate(board, mark, lines):
+    """
+    Returns a heuristic value of the board for `mark`: every line of k
+    cells holding marks of only one player counts 10 ** (marks - 1),
+    for that player if it holds their marks, against them otherwise.
+    """
+    value = 0
+    for line in lines:
+        mine = theirs = 0
+        for i, j in line:
+            cell = board[i][j]
+            if cell == mark:
+                mine += 1
+            elif cell != EMPTY:
+                theirs += 1
+        if mine and not theirs:
+            value += 10 ** (mine - 1)
+        elif theirs and not mine:
+            value -= 10 ** (theirs - 1)
+    return value
+
+
+def windows(rows, cols, k):
+    """
+    Returns every line of `k` consecutive cells on a rows x cols board.
+    """
+    lines = []
+    for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for i in range(rows):
+            for j in range(cols):
+                end_i = i + di * (k - 1)
+                end_j = j + dj * (k - 1)
+                if 0 <= end_i < rows and 0 <= end_j < cols:
+                    lines.append(tuple((i + di * step, j + dj * step)
+                                       for step in range(k)))
+    return lines
+
+
+def other(mark):
+    return O if mark == X else X
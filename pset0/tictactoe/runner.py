@@ -3,6 +3,12 @@ import sys
 import time
 
 import tictactoe as ttt
+from aiworker import AIWorker
+
+# Board dimensions and marks in a row to win, e.g. runner.py 4 4 3
+if len(sys.argv) not in (1, 4):
+    sys.exit("Usage: python runner.py [rows cols k]")
+rows, cols, k = map(int, sys.argv[1:]) if len(sys.argv) == 4 else (3, 3, 3)
 
 pygame.init()
 size = width, height = 600, 400
@@ -15,16 +21,27 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+# Shrink tiles to fit larger boards on screen
+tile_size = min(80, 280 // max(rows, cols))
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
+
+# Seconds the computer appears to think before its move is shown
+ai_delay = 0.5
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = ttt.initial_state(rows, cols)
+ai_turn = None
+
+# Compute AI moves in the background, so frames keep being drawn
+worker = AIWorker(k)
+clock = pygame.time.Clock()
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            worker.shutdown()
             sys.exit()
 
     screen.fill(black)
@@ -67,13 +84,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +105,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
+        game_over = ttt.terminal(board, k)
         player = ttt.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = ttt.winner(board, k)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -108,24 +124,29 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, without waiting for it to be computed
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
+            if ai_turn is None:
+                ai_turn = time.time()
+                worker.request(board)
+            move = worker.poll(board)
+            if move is not None and time.time() - ai_turn >= ai_delay:
                 board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+                ai_turn = None
+
+        # Precompute replies to the user's possible moves meanwhile
+        elif user == player and not game_over:
+            worker.speculate(board)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
+                        worker.keep(board)
 
         if game_over:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
@@ -140,7 +161,9 @@ while True:
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
                     user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    board = ttt.initial_state(rows, cols)
+                    ai_turn = None
+                    worker.reset()
 
     pygame.display.flip()
+    clock.tick(60)
@@ -0,0 +1,262 @@
+"""
+Tic Tac Toe self-play simulator
+
+Plays many headless games of the AI against a random player or against
+itself across a pool of processes, and reports results, throughput and
+how long the AI takes per move. Run it before and after changing an
+engine to check that play is no worse and no slower.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+
+# Engines that can choose the AI's moves
+ENGINES = ("tictactoe", "bitboard")
+
+# Latency histogram buckets per doubling, about 9% apart
+BUCKETS_PER_DOUBLING = 8
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play headless tictactoe games and report how the "
+                    "AI does."
+    )
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--opponent", choices=("random", "ai"),
+                        default="random",
+                        help="play against random moves or against itself")
+    parser.add_argument("--engine", choices=ENGINES, default="tictactoe")
+    parser.add_argument("--strategy", choices=ttt.STRATEGIES,
+                        default="alphabeta",
+                        help="search strategy for the tictactoe engine")
+    parser.add_argument("--no-book", action="store_true",
+                        help="always search instead of using the book")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("--k", type=int, default=None,
+                        help="marks in a row to win (default: the smaller "
+                             "dimension)")
+    parser.add_argument("--budget", type=float, default=ttt.DEFAULT_BUDGET,
+                        help="seconds per move on boards larger than 3x3")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=1000,
+                        help="games per task sent to a worker")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true",
+                        help="print results as JSON")
+    parser.add_argument("--fail-on-loss", action="store_true",
+                        help="exit with status 1 if the AI loses a game")
+    args = parser.parse_args()
+    if args.engine == "bitboard" and (args.rows, args.cols) != (3, 3):
+        parser.error("the bitboard engine only plays 3x3 boards")
+
+    config = {
+        "engine": args.engine,
+        "strategy": args.strategy,
+        "use_book": not args.no_book,
+        "opponent": args.opponent,
+        "rows": args.rows,
+        "cols": args.cols,
+        "k": args.k,
+        "budget": args.budget,
+    }
+    summary = simulate(config, args.games, args.processes, args.batch,
+                       args.seed)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+    if args.fail_on_loss and summary["results"]["loss"] > 0:
+        sys.exit(1)
+
+
+def simulate(config, games, processes=1, batch=1000, seed=None):
+    """
+    Plays `games` games with the settings in `config` in batches across
+    `processes` workers, and returns a summary dictionary.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    tasks = [(config, min(batch, games - start), seed + start, start)
+             for start in range(0, games, batch)]
+
+    start = time.perf_counter()
+    totals = None
+    if processes > 1:
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            for counts in pool.map(play_batch, tasks):
+                totals = merge(totals, counts)
+    else:
+        for task in tasks:
+            totals = merge(totals, play_batch(task))
+    elapsed = time.perf_counter() - start
+
+    latencies = totals["latencies"]
+    return {
+        "config": config,
+        "games": games,
+        "seed": seed,
+        "processes": processes,
+        "seconds": elapsed,
+        "results": totals["results"],
+        "rates": {
+            result: count / games if games else 0.0
+            for result, count in totals["results"].items()
+        },
+        "moves": totals["moves"],
+        "ai_moves": totals["ai_moves"],
+        "moves_per_second": totals["moves"] / elapsed if elapsed else 0.0,
+        "games_per_second": games / elapsed if elapsed else 0.0,
+        "latency_seconds": {
+            "p50": min(percentile(latencies, 50), totals["max_latency"]),
+            "p90": min(percentile(latencies, 90), totals["max_latency"]),
+            "p99": min(percentile(latencies, 99), totals["max_latency"]),
+            "max": totals["max_latency"],
+            "mean": (totals["total_latency"] / totals["ai_moves"]
+                     if totals["ai_moves"] else 0.0)
+        }
+    }
+
+
+def play_batch(task):
+    """
+    Plays a batch of games and returns their combined counts.
+
+    Against a random player, the AI plays X in even-numbered games and
+    O in odd-numbered ones. Against itself, results are for X.
+    """
+    config, games, seed, first = task
+    rng = random.Random(seed)
+    counts = {
+        "results": {"win": 0, "draw": 0, "loss": 0},
+        "moves": 0,
+        "ai_moves": 0,
+        "total_latency": 0.0,
+        "max_latency": 0.0,
+        "latencies": collections.Counter(),
+    }
+    for game in range(first, first + games):
+        if config["opponent"] == "ai":
+            ai_marks = (ttt.X, ttt.O)
+            side = ttt.X
+        else:
+            side = ttt.X if game % 2 == 0 else ttt.O
+            ai_marks = (side,)
+
+        winner = play(config, ai_marks, rng, counts)
+        if winner is None:
+            counts["results"]["draw"] += 1
+        elif winner == side:
+            counts["results"]["win"] += 1
+        else:
+            counts["results"]["loss"] += 1
+    return counts
+
+
+def play(config, ai_marks, rng, counts):
+    """
+    Plays one game, with the AI moving for each mark in `ai_marks` and
+    random moves for the other, and returns the winner or None.
+    """
+    k = config["k"]
+    board = ttt.initial_state(config["rows"], config["cols"])
+    while not ttt.terminal(board, k):
+        if ttt.player(board) in ai_marks:
+            start = time.perf_counter()
+            action = ai_move(config, board)
+            latency = time.perf_counter() - start
+            counts["ai_moves"] += 1
+            counts["total_latency"] += latency
+            counts["max_latency"] = max(counts["max_latency"], latency)
+            counts["latencies"][bucket(latency)] += 1
+        else:
+            action = rng.choice(sorted(ttt.actions(board)))
+        board = ttt.result(board, action)
+        counts["moves"] += 1
+    return ttt.winner(board, k)
+
+
+def ai_move(config, board):
+    """
+    Returns the AI's move on the board with the configured engine.
+    """
+    if config["engine"] == "bitboard":
+        return bitboard.minimax(board)
+    return ttt.minimax(board, config["strategy"], config["use_book"],
+                       config["k"], config["budget"])
+
+
+def merge(totals, counts):
+    """
+    Adds the counts of one batch into the running totals.
+    """
+    if totals is None:
+        return counts
+    for result, count in counts["results"].items():
+        totals["results"][result] += count
+    for key in ("moves", "ai_moves", "total_latency"):
+        totals[key] += counts[key]
+    totals["max_latency"] = max(totals["max_latency"], counts["max_latency"])
+    totals["latencies"].update(counts["latencies"])
+    return totals
+
+
+def bucket(seconds):
+    """
+    Returns the histogram bucket of a latency, on a logarithmic scale.
+    """
+    return math.floor(math.log2(max(seconds, 1e-9)) * BUCKETS_PER_DOUBLING)
+
+
+def percentile(histogram, p):
+    """
+    Returns the `p`th percentile latency of a bucket histogram, by
+    nearest rank, as the upper edge of the bucket it falls in.
+    """
+    total = sum(histogram.values())
+    if total == 0:
+        return 0.0
+    rank = max(1, -(-total * p // 100))
+    seen = 0
+    for index in sorted(histogram):
+        seen += histogram[index]
+        if seen >= rank:
+            return 2 ** ((index + 1) / BUCKETS_PER_DOUBLING)
+    return 0.0
+
+
+def print_summary(summary):
+    config = summary["config"]
+    results = summary["results"]
+    rates = summary["rates"]
+    latency = summary["latency_seconds"]
+    print(f"{summary['games']} games of {config['engine']} AI vs "
+          f"{config['opponent']} on {config['rows']}x{config['cols']} "
+          f"in {summary['seconds']:.2f}s ({summary['processes']} "
+          f"processes, seed {summary['seed']})")
+    print(f"Wins: {results['win']} ({rates['win']:.2%}), "
+          f"draws: {results['draw']} ({rates['draw']:.2%}), "
+          f"losses: {results['loss']} ({rates['loss']:.2%})")
+    print(f"Moves: {summary['moves']} "
+          f"({summary['moves_per_second']:.0f}/s), "
+          f"AI moves: {summary['ai_moves']}")
+    print(f"AI move latency: p50 {latency['p50'] * 1e3:.3f}ms, "
+          f"p90 {latency['p90'] * 1e3:.3f}ms, "
+          f"p99 {latency['p99'] * 1e3:.3f}ms, "
+          f"max {latency['max'] * 1e3:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
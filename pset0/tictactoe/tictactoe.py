@@ -4,19 +4,63 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
+import struct
+import sys
+import time
 
 X = "X"
 O = "O"
 EMPTY = None
 
-
-def initial_state():
+# Ways minimax can search the game tree
+STRATEGIES = ("minimax", "alphabeta")
+
+# Number of boards visited by the most recent minimax call
+stats = {"nodes": 0}
+
+# Cells of each row, column and diagonal
+LINES = (
+    ((0, 0), (0, 1), (0, 2)), ((1, 0), (1, 1), (1, 2)),
+    ((2, 0), (2, 1), (2, 2)), ((0, 0), (1, 0), (2, 0)),
+    ((0, 1), (1, 1), (2, 1)), ((0, 2), (1, 2), (2, 2)),
+    ((0, 0), (1, 1), (2, 2)), ((0, 2), (1, 1), (2, 0)),
+)
+
+# Order in which to try cells: center, then corners, then edges
+CELL_ORDER = ((1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1))
+
+# Where cell 3 * i + j moves under each rotation and reflection
+SYMMETRIES = tuple(
+    tuple(3 * a + b for a, b in (transform(i, j)
+                                 for i in range(3) for j in range(3)))
+    for transform in (
+        lambda i, j: (i, j), lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j), lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j), lambda i, j: (2 - i, j),
+        lambda i, j: (j, i), lambda i, j: (2 - j, 2 - i),
+    )
+)
+
+# Seconds minimax may spend searching boards larger than 3x3
+DEFAULT_BUDGET = 1.0
+
+# Opening book written by book.py, one record per canonical position:
+# the position's code (see `canonical`) and its best cell 3 * i + j
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "book.bin")
+BOOK_RECORD = struct.Struct("<HB")
+
+# Opening book mapping position codes to cells, loaded on first use
+book = None
+
+
+def initial_state(rows=3, cols=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * cols for _ in range(rows)]
 
 
 def player(board):
@@ -77,11 +121,23 @@ def result(board, action):
         return newboard
 
 
-def winner(board):
+def winner(board, k=None):
     """
     Returns the winner of the game, if there is one.
+
+    `k` is the number of marks in a row needed to win, by default
+    the smaller dimension of the board.
     """
 
+    # Check every mark on boards other than 3x3 with 3 in a row
+    k = win_length(board, k)
+    if (len(board), len(board[0]), k) != (3, 3, 3):
+        for i in range(len(board)):
+            for j in range(len(board[0])):
+                if board[i][j] != EMPTY and wins_at(board, i, j, k):
+                    return board[i][j]
+        return None
+
     # Initialize win variable
     win = None
 
@@ -123,7 +179,7 @@ def winner(board):
         return None
 
 
-def terminal(board):
+def terminal(board, k=None):
     """
     Returns True if game is over, False otherwise.
     """
@@ -134,30 +190,85 @@ def terminal(board):
         num += row.count(X) + row.count(O)
 
     # Return True if winner or all board spaces occupied, otherwise False
-    if winner(board) is not None or num == 9:
+    if winner(board, k) is not None or num == len(board) * len(board[0]):
         return True
     else:
         return False
 
 
-def utility(board):
+def utility(board, k=None):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
 
     # Use winner function to return numeric utility values
-    if winner(board) == X:
+    if winner(board, k) == X:
         return 1
-    elif winner(board) == O:
+    elif winner(board, k) == O:
         return -1
     else:
         return 0
 
 
-def minimax(board):
+def win_length(board, k=None):
+    """
+    Returns `k`, or if it is None the smaller dimension of the board.
+    """
+    return k if k is not None else min(len(board), len(board[0]))
+
+
+def wins_at(board, i, j, k):
+    """
+    Returns True if the mark at (i, j) is part of `k` or more in a row,
+    looking only at the four lines through that cell. After a move, this
+    is the only place a new line can have been completed.
+    """
+    mark = board[i][j]
+    rows = len(board)
+    cols = len(board[0])
+    for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        count = 1
+        for sign in (1, -1):
+            a, b = i + sign * di, j + sign * dj
+            while (0 <= a < rows and 0 <= b < cols
+                   and board[a][b] == mark):
+                count += 1
+                a += sign * di
+                b += sign * dj
+        if count >= k:
+            return True
+    return False
+
+
+def minimax(board, strategy="minimax", use_book=True, k=None,
+            budget=DEFAULT_BUDGET, cancel=None):
     """
     Returns the optimal action for the current player on the board.
+
+    If `use_book` is True and the opening book exists, the action is
+    looked up in it. Otherwise, `strategy` is "minimax" to search the
+    whole game tree, or "alphabeta" to prune it, see `alphabeta`. The
+    number of boards visited is left in `stats["nodes"]`.
+
+    Boards other than 3x3 with 3 in a row to win are too large to
+    search fully, so they are searched by `mnk.search` for up to
+    `budget` seconds, ignoring `strategy`, or until the `cancel`
+    event is set.
     """
+    if strategy not in STRATEGIES:
+        raise Exception(f"Unknown strategy {strategy}")
+    stats["nodes"] = 0
+    k = win_length(board, k)
+    if (len(board), len(board[0]), k) != (3, 3, 3):
+        # Imported here, as mnk builds on this module
+        import mnk
+        return mnk.search(board, k, budget, stats, cancel=cancel)
+    if use_book:
+        action = book_move(board)
+        if action is not None:
+            return action
+    if strategy == "alphabeta":
+        return alphabeta(board)
 
     # Initialize variable
     optimal = ""
@@ -199,6 +310,7 @@ def max_score(board):
     """
     Returns the maximal score.
     """
+    stats["nodes"] += 1
 
     # If action leads to terminal state then return score
     if terminal(board):
@@ -216,6 +328,7 @@ def min_score(board):
     """
     Returns the minimal score.
     """
+    stats["nodes"] += 1
 
     # If action leads to terminal state then return score
     if terminal(board):
@@ -227,3 +340,196 @@ def min_score(board):
     for action in actions(board):
         minscore = min(minscore, max_score(result(board, action)))
     return minscore
+
+
+def alphabeta(board):
+    """
+    Returns the optimal action for the current player on the board,
+    pruning branches that cannot change the result.
+
+    Moves are tried in `ordered_actions` order, so the best move is
+    usually searched first and most of its siblings are cut off.
+    """
+    if terminal(board):
+        return None
+
+    # Search each move with the best score found so far as a bound
+    cplayer = player(board)
+    alpha = -math.inf
+    beta = math.inf
+    optimal = None
+    for action in ordered_actions(board):
+        if cplayer == X:
+            score = alphabeta_min(result(board, action), alpha, beta)
+            if score > alpha:
+                alpha = score
+                optimal = action
+        else:
+            score = alphabeta_max(result(board, action), alpha, beta)
+            if score < beta:
+                beta = score
+                optimal = action
+
+        # Stop at a forced win, no move can do better
+        if alpha == 1 or beta == -1:
+            break
+    return optimal
+
+
+def alphabeta_max(board, alpha, beta):
+    """
+    Returns the maximal score, or a score of at least `beta`
+    as soon as the minimizing player would avoid this board.
+    """
+    stats["nodes"] += 1
+    if terminal(board):
+        return utility(board)
+    maxscore = -math.inf
+    for action in ordered_actions(board):
+        maxscore = max(maxscore, alphabeta_min(result(board, action),
+                                               alpha, beta))
+        if maxscore >= beta:
+            return maxscore
+        alpha = max(alpha, maxscore)
+    return maxscore
+
+
+def alphabeta_min(board, alpha, beta):
+    """
+    Returns the minimal score, or a score of at most `alpha`
+    as soon as the maximizing player would avoid this board.
+    """
+    stats["nodes"] += 1
+    if terminal(board):
+        return utility(board)
+    minscore = math.inf
+    for action in ordered_actions(board):
+        minscore = min(minscore, alphabeta_max(result(board, action),
+                                               alpha, beta))
+        if minscore <= alpha:
+            return minscore
+        beta = min(beta, minscore)
+    return minscore
+
+
+def ordered_actions(board):
+    """
+    Returns the possible actions as a list, most promising first:
+    winning moves, then moves blocking the opponent from winning,
+    then the remaining cells center first, corners, then edges.
+    """
+    cplayer = player(board)
+    opponent = O if cplayer == X else X
+    wins = []
+    blocks = []
+    others = []
+    for cell in CELL_ORDER:
+        if board[cell[0]][cell[1]] != EMPTY:
+            continue
+        if completes(board, cell, cplayer):
+            wins.append(cell)
+        elif completes(board, cell, opponent):
+            blocks.append(cell)
+        else:
+            others.append(cell)
+    return wins + blocks + others
+
+
+def completes(board, cell, mark):
+    """
+    Returns True if placing `mark` on the empty `cell` completes a line.
+    """
+    for line in LINES:
+        if cell in line and all(
+            other == cell or board[other[0]][other[1]] == mark
+            for other in line
+        ):
+            return True
+    return False
+
+
+def canonical(board):
+    """
+    Returns (code, symmetry) for the board, where code is the smallest
+    base-3 number (0 empty, 1 X, 2 O per cell) of the board under any
+    of the 8 `SYMMETRIES`, and symmetry is the index of one giving it.
+    """
+    values = [0 if cell == EMPTY else 1 if cell == X else 2
+              for row in board for cell in row]
+    best = None
+    for index, symmetry in enumerate(SYMMETRIES):
+        code = 0
+        for cell in range(9):
+            code += values[cell] * 3 ** symmetry[cell]
+        if best is None or code < best[0]:
+            best = (code, index)
+    return best
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Returns the opening book at `path` as a dictionary mapping position
+    codes to cells, or an empty dictionary if there is no valid book.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    if len(data) % BOOK_RECORD.size:
+        return {}
+    return dict(BOOK_RECORD.iter_unpack(data))
+
+
+def book_move(board):
+    """
+    Returns the opening book's action for the board, or None if there
+    is no book or the position is not in it.
+    """
+    global book
+    if book is None:
+        book = load_book()
+    if not book:
+        return None
+    code, index = canonical(board)
+    cell = book.get(code)
+    if cell is None:
+        return None
+
+    # Map the book's cell back through the symmetry
+    cell = SYMMETRIES[index].index(cell)
+    return divmod(cell, 3)
+
+
+def main():
+    """
+    Compares the strategies from the empty board, or from a board given
+    as nine characters X, O or - (row by row) on the command line.
+    """
+    if len(sys.argv) not in (1, 2):
+        sys.exit("Usage: python tictactoe.py [board]")
+    board = initial_state()
+    if len(sys.argv) == 2:
+        cells = sys.argv[1]
+        if len(cells) != 9 or any(c not in "XO-" for c in cells):
+            sys.exit("Board must be nine characters X, O or -")
+        for i in range(3):
+            for j in range(3):
+                if cells[3 * i + j] != "-":
+                    board[i][j] = cells[3 * i + j]
+
+    for strategy in STRATEGIES:
+        start = time.perf_counter()
+        action = minimax(board, strategy, use_book=False)
+        elapsed = time.perf_counter() - start
+        print(f"{strategy}: move {action}, {stats['nodes']} nodes, "
+              f"{elapsed:.3f}s")
+    start = time.perf_counter()
+    action = book_move(board)
+    elapsed = time.perf_counter() - start
+    if action is not None:
+        print(f"book: move {action}, {elapsed:.6f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import random
+import time
+
+import puzzle
+from logic import (And, Biconditional, Implication, Not, Or, Symbol,
+                   batch_check, model_check)
+
+# Evaluation modes of model_check to compare, and of batch_check prefixed
+# with "batch-"
+MODES = ("tree", "compiled", "bitwise", "sat", "batch-bitwise",
+         "batch-sat")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time model_check evaluation modes on the knights "
+                    "puzzles and on random knowledge bases."
+    )
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--symbols", default="8,12,16",
+                        help="symbol counts of the random knowledge bases")
+    parser.add_argument("--sentences", type=int, default=20,
+                        help="sentences per random knowledge base")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    modes = args.modes.split(",")
+
+    # All six queries against each puzzle
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    for name, knowledge in (("puzzle 0", puzzle.knowledge0),
+                            ("puzzle 1", puzzle.knowledge1),
+                            ("puzzle 2", puzzle.knowledge2),
+                            ("puzzle 3", puzzle.knowledge3)):
+        report(name, knowledge, symbols, modes)
+
+    # Random knowledge bases, queried on symbols they entail or not
+    rng = random.Random(args.seed)
+    for n in map(int, args.symbols.split(",")):
+        names = [Symbol(f"S{i}") for i in range(n)]
+        knowledge = And(*(random_sentence(rng, names, 3)
+                          for _ in range(args.sentences)))
+        report(f"{n} symbols", knowledge, names[:6], modes)
+
+
+def report(name, knowledge, queries, modes):
+    """
+    Times each mode answering every query, checking that they agree.
+    """
+    timings = {}
+    answers = {}
+    for mode in modes:
+        start = time.perf_counter()
+        if mode.startswith("batch-"):
+            answers[mode] = batch_check(knowledge, queries,
+                                        mode[len("batch-"):])
+        else:
+            answers[mode] = [model_check(knowledge, query, mode)
+                             for query in queries]
+        timings[mode] = time.perf_counter() - start
+    if any(answer != answers[modes[0]] for answer in answers.values()):
+        raise Exception(f"modes disagree on {name}")
+
+    baseline = timings[modes[0]]
+    print(f"{name}: " + ", ".join(
+        f"{mode} {timings[mode] * 1e3:.2f}ms "
+        f"({baseline / timings[mode]:.1f}x)"
+        for mode in modes
+    ))
+
+
+def random_sentence(rng, symbols, depth):
+    """
+    Returns a random sentence over `symbols` nested up to `depth` deep.
+    """
+    if depth == 0 or rng.random() < 0.2:
+        symbol = rng.choice(symbols)
+        return Not(symbol) if rng.random() < 0.5 else symbol
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(rng, symbols, depth - 1))
+    if kind == 1:
+        return And(*(random_sentence(rng, symbols, depth - 1)
+                     for _ in range(rng.randrange(1, 4))))
+    if kind == 2:
+        return Or(*(random_sentence(rng, symbols, depth - 1)
+                    for _ in range(rng.randrange(1, 4))))
+    if kind == 3:
+        return Implication(random_sentence(rng, symbols, depth - 1),
+                           random_sentence(rng, symbols, depth - 1))
+    return Biconditional(random_sentence(rng, symbols, depth - 1),
+                         random_sentence(rng, symbols, depth - 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Symbols whose values vary within one chunk of the truth table; a chunk
+# is a 2 ** CHUNK_SYMBOLS bit integer, and each of the remaining symbols
+# is constant across a chunk
+CHUNK_SYMBOLS = 16
+
+
+def columns(count):
+    """
+    Returns the truth table columns of `count` symbols over the 2 ** count
+    rows where row r gives symbol i the value of bit i of r.
+    """
+    rows = 1 << count
+    result = []
+    for i in range(count):
+        # 2 ** i false rows then 2 ** i true rows, repeated
+        width = 1 << i
+        column = ((1 << width) - 1) << width
+        period = width * 2
+        while period < rows:
+            column |= column << period
+            period *= 2
+        result.append(column)
+    return result
+
+
+def truth_table(sentence, values, mask, memo):
+    """
+    Returns the truth table of `sentence` as an integer with one bit per
+    row, given the table of each symbol name in `values`. `mask` has a bit
+    set for every row, and `memo` caches tables of compound subsentences.
+    """
+    if isinstance(sentence, Symbol):
+        try:
+            return values[sentence.name]
+        except KeyError:
+            raise Exception(f"variable {sentence.name} not in model")
+
+    entry = memo.get(id(sentence))
+    if entry is not None:
+        return entry[0]
+
+    if isinstance(sentence, Not):
+        table = mask ^ truth_table(sentence.operand, values, mask, memo)
+    elif isinstance(sentence, And):
+        table = mask
+        for conjunct in sentence.conjuncts:
+            table &= truth_table(conjunct, values, mask, memo)
+            if not table:
+                break
+    elif isinstance(sentence, Or):
+        table = 0
+        for disjunct in sentence.disjuncts:
+            table |= truth_table(disjunct, values, mask, memo)
+            if table == mask:
+                break
+    elif isinstance(sentence, Implication):
+        antecedent = truth_table(sentence.antecedent, values, mask, memo)
+        consequent = truth_table(sentence.consequent, values, mask, memo)
+        table = (mask ^ antecedent) | consequent
+    elif isinstance(sentence, Biconditional):
+        left = truth_table(sentence.left, values, mask, memo)
+        right = truth_table(sentence.right, values, mask, memo)
+        table = mask ^ (left ^ right)
+    else:
+        raise TypeError("must be a logical sentence")
+
+    # Keyed by identity, with the sentence kept so the key is not reused
+    memo[id(sentence)] = (table, sentence)
+    return table
+
+
+def bitwise_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by computing their whole truth
+    tables with bitwise operations on integers, one chunk at a time.
+    """
+    return bitwise_batch(knowledge, [query])[0]
+
+
+def bitwise_batch(knowledge, queries):
+    """
+    Returns a list of whether knowledge base entails each query, computing
+    the truth table of knowledge once for all of them.
+    """
+    symbols = set.union(knowledge.symbols(),
+                        *(query.symbols() for query in queries))
+    symbols = sorted(symbols)
+    varying = symbols[:CHUNK_SYMBOLS]
+    constant = symbols[CHUNK_SYMBOLS:]
+    mask = (1 << (1 << len(varying))) - 1
+    values = dict(zip(varying, columns(len(varying))))
+    results = [True] * len(queries)
+
+    # Each chunk fixes the symbols beyond the first CHUNK_SYMBOLS
+    for chunk in range(1 << len(constant)):
+        for i, name in enumerate(constant):
+            values[name] = mask if chunk >> i & 1 else 0
+
+        # Any row where knowledge is true and query false is a counterexample
+        memo = {}
+        knowledge_table = truth_table(knowledge, values, mask, memo)
+        if not knowledge_table:
+            continue
+        for i, query in enumerate(queries):
+            if results[i] and knowledge_table & ~truth_table(
+                query, values, mask, memo
+            ):
+                results[i] = False
+        if not any(results):
+            break
+    return results
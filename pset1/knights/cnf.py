@@ -0,0 +1,85 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Conjunctive normal form of logical sentences by the Tseitin
+    transformation.
+
+    Each symbol gets a variable, and so does each compound subsentence,
+    with clauses making it equivalent to its parts. The clauses grow
+    linearly with the size of the sentences, where distributing Or over
+    And could grow exponentially. Literals are integers, negative when
+    negated, as used by `sat.Solver`.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.count = 0
+
+        # Literal of each encoded compound sentence, keyed by identity,
+        # with the sentences kept alive so identities are not reused
+        self.encoded = {}
+        self.sentences = []
+
+    def variable(self, name):
+        """Returns the variable of the symbol named `name`."""
+        if name not in self.variables:
+            self.variables[name] = self.fresh()
+        return self.variables[name]
+
+    def fresh(self):
+        self.count += 1
+        return self.count
+
+    def add(self, sentence):
+        """Adds clauses requiring `sentence` to be true."""
+        self.clauses.append([self.encode(sentence)])
+
+    def encode(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, adding the clauses
+        that define it.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.encode(sentence.operand)
+        literal = self.encoded.get(id(sentence))
+        if literal is not None:
+            return literal
+
+        if isinstance(sentence, And):
+            parts = [self.encode(conjunct) for conjunct in sentence.conjuncts]
+            literal = self.fresh()
+            for part in parts:
+                self.clauses.append([-literal, part])
+            self.clauses.append([literal] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.encode(disjunct) for disjunct in sentence.disjuncts]
+            literal = self.fresh()
+            for part in parts:
+                self.clauses.append([literal, -part])
+            self.clauses.append([-literal] + parts)
+        elif isinstance(sentence, Implication):
+            antecedent = self.encode(sentence.antecedent)
+            consequent = self.encode(sentence.consequent)
+            literal = self.fresh()
+            self.clauses.append([-literal, -antecedent, consequent])
+            self.clauses.append([literal, antecedent])
+            self.clauses.append([literal, -consequent])
+        elif isinstance(sentence, Biconditional):
+            left = self.encode(sentence.left)
+            right = self.encode(sentence.right)
+            literal = self.fresh()
+            self.clauses.append([-literal, -left, right])
+            self.clauses.append([-literal, left, -right])
+            self.clauses.append([literal, left, right])
+            self.clauses.append([literal, -left, -right])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.encoded[id(sentence)] = literal
+        self.sentences.append(sentence)
+        return literal
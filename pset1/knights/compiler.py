@@ -0,0 +1,143 @@
+import itertools
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Deepest expression nesting before a subexpression is computed into a
+# local variable, well within the limits of Python's parser
+MAX_DEPTH = 50
+
+
+class Compiler():
+    """
+    Translates a logical sentence into the source of one Python function
+    of a model, a sequence of truth values indexed by symbol number.
+
+    Subexpressions nested too deeply, and subsentences shared between
+    several parents, are computed once into local variables first.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.lines = []
+        self.locals = {}
+        self.sentences = []
+
+    def source(self, sentence):
+        """Returns the source of a function `evaluate(m)`."""
+        self.shared = shared(sentence)
+        expression, _ = self.expression(sentence)
+        lines = ["def evaluate(m):"]
+        lines.extend(f"    {line}" for line in self.lines)
+        lines.append(f"    return {expression}")
+        return "\n".join(lines)
+
+    def expression(self, sentence):
+        """
+        Returns (expression, depth) for `sentence`, where depth is how
+        deeply the expression nests parentheses.
+        """
+        if isinstance(sentence, Symbol):
+            try:
+                return f"m[{self.index[sentence.name]}]", 0
+            except KeyError:
+                raise Exception(f"variable {sentence.name} not in model")
+
+        name = self.locals.get(id(sentence))
+        if name is not None:
+            return name, 0
+
+        if isinstance(sentence, Not):
+            operand, depth = self.expression(sentence.operand)
+            expression = f"not ({operand})"
+        elif isinstance(sentence, (And, Or)):
+            parts = sentence.conjuncts if isinstance(sentence, And) \
+                else sentence.disjuncts
+            compiled = [self.expression(part) for part in parts]
+            if not compiled:
+                return ("True" if isinstance(sentence, And) else "False"), 0
+            operator = " and " if isinstance(sentence, And) else " or "
+            expression = operator.join(
+                f"({part})" for part, _ in compiled
+            )
+            depth = max(depth for _, depth in compiled)
+        elif isinstance(sentence, Implication):
+            antecedent, left = self.expression(sentence.antecedent)
+            consequent, right = self.expression(sentence.consequent)
+            expression = f"not ({antecedent}) or ({consequent})"
+            depth = max(left, right)
+        elif isinstance(sentence, Biconditional):
+            left, left_depth = self.expression(sentence.left)
+            right, right_depth = self.expression(sentence.right)
+            expression = f"bool({left}) == bool({right})"
+            depth = max(left_depth, right_depth)
+        else:
+            raise TypeError("must be a logical sentence")
+
+        depth += 1
+        if depth > MAX_DEPTH or id(sentence) in self.shared:
+            return self.hoist(sentence, expression), 0
+        return expression, depth
+
+    def hoist(self, sentence, expression):
+        """Computes an expression into a new local variable."""
+        name = f"t{len(self.lines)}"
+        self.lines.append(f"{name} = {expression}")
+        self.locals[id(sentence)] = name
+        self.sentences.append(sentence)
+        return name
+
+
+def shared(sentence):
+    """
+    Returns the identities of compound subsentences of `sentence` that
+    appear more than once in it.
+    """
+    seen = set()
+    repeated = set()
+    stack = [sentence]
+    while stack:
+        sentence = stack.pop()
+        if isinstance(sentence, Symbol):
+            continue
+        if id(sentence) in seen:
+            repeated.add(id(sentence))
+            continue
+        seen.add(id(sentence))
+        if isinstance(sentence, Not):
+            stack.append(sentence.operand)
+        elif isinstance(sentence, And):
+            stack.extend(sentence.conjuncts)
+        elif isinstance(sentence, Or):
+            stack.extend(sentence.disjuncts)
+        elif isinstance(sentence, Implication):
+            stack.extend((sentence.antecedent, sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            stack.extend((sentence.left, sentence.right))
+    return repeated
+
+
+def compile_sentence(sentence, index):
+    """
+    Returns a function evaluating `sentence` on a model given as a
+    sequence of truth values, where `index` maps each symbol name to its
+    position in the sequence.
+    """
+    namespace = {}
+    exec(Compiler(index).source(sentence), namespace)
+    return namespace["evaluate"]
+
+
+def compiled_check(knowledge, query):
+    """Checks if knowledge base entails query, with compiled sentences."""
+
+    # Number the symbols, then compile both sentences over that numbering
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {name: i for i, name in enumerate(symbols)}
+    knowledge = compile_sentence(knowledge, index)
+    query = compile_sentence(query, index)
+
+    # Every model where knowledge is true must make query true
+    for model in itertools.product((True, False), repeat=len(symbols)):
+        if knowledge(model) and not query(model):
+            return False
+    return True
@@ -1,16 +1,66 @@
+import functools
 import itertools
+import weakref
+
+
+def cached(slot):
+    """
+    Decorates a method of no arguments so that its result is stored in
+    `slot` on interned sentences, which never change.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            value = getattr(self, slot)
+            if value is None:
+                value = method(self)
+                if self.interned:
+                    setattr(self, slot, value)
+            return value
+        return wrapper
+    return decorator
+
+
+def cached_set(slot):
+    """
+    Like `cached`, for a method returning a set: interned sentences store
+    it frozen in `slot`, and every call returns a fresh copy that the
+    caller may change.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            frozen = getattr(self, slot)
+            if frozen is None:
+                value = method(self)
+                if not self.interned:
+                    return value
+                frozen = frozenset(value)
+                setattr(self, slot, frozen)
+            return set(frozen)
+        return wrapper
+    return decorator
 
 
 class Sentence():
+    __slots__ = ("interned", "_hash", "_symbols", "_formula", "__weakref__")
+
+    def __init__(self):
+        self.interned = False
+        self._hash = None
+        self._symbols = None
+        self._formula = None
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    @cached("_formula")
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
+    @cached_set("_symbols")
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
         return set()
@@ -43,13 +93,16 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
+        Sentence.__init__(self)
         self.name = name
 
     def __eq__(self, other):
         return isinstance(other, Symbol) and self.name == other.name
 
+    @cached("_hash")
     def __hash__(self):
         return hash(("symbol", self.name))
 
@@ -62,21 +115,27 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    @cached("_formula")
     def formula(self):
         return self.name
 
+    @cached_set("_symbols")
     def symbols(self):
         return {self.name}
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
+        Sentence.__init__(self)
         Sentence.validate(operand)
         self.operand = operand
 
     def __eq__(self, other):
         return isinstance(other, Not) and self.operand == other.operand
 
+    @cached("_hash")
     def __hash__(self):
         return hash(("not", hash(self.operand)))
 
@@ -86,15 +145,20 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    @cached("_formula")
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
+    @cached_set("_symbols")
     def symbols(self):
         return self.operand.symbols()
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
+        Sentence.__init__(self)
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
@@ -102,6 +166,7 @@ class And(Sentence):
     def __eq__(self, other):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
+    @cached("_hash")
     def __hash__(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
@@ -114,24 +179,31 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        if self.interned:
+            raise Exception("cannot add to an interned sentence")
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    @cached("_formula")
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
+    @cached_set("_symbols")
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
+        Sentence.__init__(self)
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
@@ -139,6 +211,7 @@ class Or(Sentence):
     def __eq__(self, other):
         return isinstance(other, Or) and self.disjuncts == other.disjuncts
 
+    @cached("_hash")
     def __hash__(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
@@ -151,18 +224,23 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    @cached("_formula")
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
+    @cached_set("_symbols")
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
+        Sentence.__init__(self)
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
@@ -173,6 +251,7 @@ class Implication(Sentence):
                 and self.antecedent == other.antecedent
                 and self.consequent == other.consequent)
 
+    @cached("_hash")
     def __hash__(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
@@ -183,17 +262,22 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    @cached("_formula")
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
+    @cached_set("_symbols")
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
+        Sentence.__init__(self)
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
@@ -204,6 +288,7 @@ class Biconditional(Sentence):
                 and self.left == other.left
                 and self.right == other.right)
 
+    @cached("_hash")
     def __hash__(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
@@ -216,17 +301,90 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    @cached("_formula")
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
+    @cached_set("_symbols")
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+# Interned sentences, keyed by class and then by symbol name or by the
+# identities of their interned parts
+intern_table = weakref.WeakValueDictionary()
+
+
+def intern(sentence):
+    """
+    Returns a sentence structurally equal to `sentence` that shares its
+    nodes with every other interned sentence, so that equal subsentences
+    are one object. Interned sentences cache their hash, symbols and
+    formula, and cannot be added to.
+    """
+    memo = {}
+
+    def visit(sentence):
+        if sentence.interned:
+            return sentence
+        node = memo.get(id(sentence))
+        if node is not None:
+            return node
+
+        if isinstance(sentence, Symbol):
+            arguments = (sentence.name,)
+            key = (Symbol, sentence.name)
+        else:
+            if isinstance(sentence, Not):
+                parts = (sentence.operand,)
+            elif isinstance(sentence, And):
+                parts = sentence.conjuncts
+            elif isinstance(sentence, Or):
+                parts = sentence.disjuncts
+            elif isinstance(sentence, Implication):
+                parts = (sentence.antecedent, sentence.consequent)
+            elif isinstance(sentence, Biconditional):
+                parts = (sentence.left, sentence.right)
+            else:
+                raise TypeError("must be a logical sentence")
+            arguments = tuple(visit(part) for part in parts)
+            key = (type(sentence),) + tuple(id(part) for part in arguments)
+
+        # Parts are kept alive by the node, so their identities stay valid
+        # for as long as the key is in the table
+        node = intern_table.get(key)
+        if node is None:
+            node = type(sentence)(*arguments)
+            node.interned = True
+            intern_table[key] = node
+        memo[id(sentence)] = node
+        return node
+
+    return visit(sentence)
+
+
+def model_check(knowledge, query, mode="tree"):
+    """
+    Checks if knowledge base entails query.
+
+    `mode` is "tree" to evaluate the sentences by walking them for each
+    model, "compiled" to compile them into Python functions first,
+    "bitwise" to compute their truth tables as bits of integers, or
+    "sat" to ask a SAT solver for a counterexample, see `sat_check`.
+    """
+    if mode == "compiled":
+        # Imported here, as the compiler builds on the sentence classes
+        from compiler import compiled_check
+        return compiled_check(knowledge, query)
+    elif mode == "bitwise":
+        from bitwise import bitwise_check
+        return bitwise_check(knowledge, query)
+    elif mode == "sat":
+        return sat_check(knowledge, query)
+    elif mode != "tree":
+        raise Exception(f"unknown mode {mode}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +419,65 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by checking with a SAT solver
+    that knowledge and not query cannot both be true.
+    """
+    return sat_batch(knowledge, [query])[0]
+
+
+def sat_batch(knowledge, queries):
+    """
+    Returns a list of whether knowledge base entails each query, asking
+    one SAT solver about every query in turn so that the clauses it
+    learns about knowledge carry over from one query to the next.
+    """
+
+    # Imported here, as both modules build on the sentence classes
+    from cnf import CNF
+    from sat import Solver
+
+    # Encode knowledge as a requirement and each query as a literal
+    cnf = CNF()
+    cnf.add(knowledge)
+    literals = [cnf.encode(query) for query in queries]
+
+    solver = Solver()
+    for clause in cnf.clauses:
+        if not solver.add_clause(clause):
+            return [True] * len(queries)
+
+    results = [None] * len(queries)
+    for i, literal in enumerate(literals):
+        if results[i] is not None:
+            continue
+        if not solver.solve([-literal]):
+            results[i] = True
+            continue
+
+        # The model refutes every query it makes false, not just this one
+        for j in range(i, len(literals)):
+            value = solver.model.get(abs(literals[j]), False)
+            if results[j] is None and value != (literals[j] > 0):
+                results[j] = False
+    return results
+
+
+def batch_check(knowledge, queries, mode="bitwise"):
+    """
+    Returns a list of whether knowledge base entails each query, sharing
+    the work on knowledge between queries.
+
+    `mode` is "bitwise" to compute the truth table of knowledge once, or
+    "sat" to keep one SAT solver across the queries.
+    """
+    queries = list(queries)
+    if mode == "bitwise":
+        from bitwise import bitwise_batch
+        return bitwise_batch(knowledge, queries)
+    elif mode == "sat":
+        return sat_batch(knowledge, queries)
+    raise Exception(f"unknown mode {mode}")
@@ -81,8 +81,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
+            entailed = batch_check(intern(knowledge), symbols)
+            for symbol, result in zip(symbols, entailed):
+                if result:
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,281 @@
+class Solver():
+    """
+    Conflict-driven clause learning (CDCL) SAT solver.
+
+    Variables are positive integers and literals are nonzero integers,
+    negative for a negated variable, as in DIMACS CNF. Each clause
+    watches two of its literals and is only visited when one of them
+    becomes false. Conflicts are analyzed to their first unique implication
+    point, and the learned clause is kept for later solves, so one solver
+    can answer many queries under different assumptions.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.watches = {}
+        self.value = {}
+        self.level = {}
+        self.reason = {}
+        self.activity = {}
+        self.polarity = {}
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.increment = 1.0
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def variable(self, v):
+        """Makes variable `v` known to the solver."""
+        if v not in self.value:
+            self.value[v] = None
+            self.activity[v] = 0.0
+            self.polarity[v] = False
+            self.watches[v] = []
+            self.watches[-v] = []
+
+    def add_clause(self, clause):
+        """
+        Adds a clause, a collection of literals at least one of which must
+        be true. Returns False if the clauses are now unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+
+        # Drop duplicate literals and those already false, and skip
+        # tautologies and clauses already satisfied
+        literals = []
+        for literal in clause:
+            self.variable(abs(literal))
+            value = self.literal_value(literal)
+            if value is True or -literal in literals:
+                return True
+            if value is None and literal not in literals:
+                literals.append(literal)
+
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.enqueue(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(literals)
+        return self.ok
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every literal in
+        `assumptions` true, leaving a satisfying assignment in `model` as
+        a dictionary of variables to booleans, or False if they are not.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self.variable(abs(literal))
+        assumptions = list(assumptions)
+
+        restart = 100
+        conflicts = 0
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    conflicts += 1
+                    if not self.trail_limits:
+                        self.ok = False
+                        return False
+                    learned, level = self.analyze(conflict)
+                    self.backtrack(level)
+                    if len(learned) == 1:
+                        self.enqueue(learned[0], None)
+                    else:
+                        self.enqueue(learned[0], self.attach(learned))
+                    self.decay()
+                    continue
+
+                # Restart now and then, keeping what was learned
+                if conflicts >= restart:
+                    conflicts = 0
+                    restart = int(restart * 1.5)
+                    self.backtrack(0)
+                    continue
+
+                # Assume the assumptions first, one decision level each
+                literal = None
+                while len(self.trail_limits) < len(assumptions):
+                    assumption = assumptions[len(self.trail_limits)]
+                    value = self.literal_value(assumption)
+                    if value is False:
+                        return False
+                    self.trail_limits.append(len(self.trail))
+                    if value is None:
+                        literal = assumption
+                        break
+                if literal is None:
+                    literal = self.decide()
+                    if literal is None:
+                        self.model = {v: bool(value)
+                                      for v, value in self.value.items()}
+                        return True
+                    self.trail_limits.append(len(self.trail))
+                self.decisions += 1
+                self.enqueue(literal, None)
+        finally:
+            self.backtrack(0)
+
+    def literal_value(self, literal):
+        value = self.value[abs(literal)]
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def enqueue(self, literal, reason):
+        v = abs(literal)
+        self.value[v] = literal > 0
+        self.level[v] = len(self.trail_limits)
+        self.reason[v] = reason
+        self.trail.append(literal)
+
+    def attach(self, literals):
+        """Stores a clause and watches its first two literals."""
+        index = len(self.clauses)
+        self.clauses.append(literals)
+        self.watches[literals[0]].append(index)
+        self.watches[literals[1]].append(index)
+        return index
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns the index
+        of a clause made false, or None if there is no conflict.
+        """
+        clauses = self.clauses
+        watches = self.watches
+        value = self.value
+        while self.head < len(self.trail):
+            literal = self.trail[self.head]
+            self.head += 1
+            self.propagations += 1
+
+            # Visit clauses watching the literal that just became false
+            false = -literal
+            watching = watches[false]
+            kept = []
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+
+                # Satisfied by the other watched literal
+                first = clause[0]
+                first_value = value[abs(first)]
+                if first_value is not None and first_value == (first > 0):
+                    kept.append(index)
+                    continue
+
+                # Watch another literal that is not false, if any
+                for k in range(2, len(clause)):
+                    other = clause[k]
+                    other_value = value[abs(other)]
+                    if other_value is None or other_value == (other > 0):
+                        clause[1], clause[k] = other, false
+                        watches[other].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if first_value is None:
+                        self.enqueue(first, index)
+                    else:
+                        kept.extend(watching[position + 1:])
+                        watches[false] = kept
+                        self.head = len(self.trail)
+                        return index
+            watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns a learned clause, with the literal it asserts first, and
+        the decision level to backtrack to, from a conflicting clause.
+        """
+        learned = [None]
+        seen = set()
+        current = len(self.trail_limits)
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                v = abs(other)
+                if v not in seen and self.level[v] > 0:
+                    seen.add(v)
+                    self.bump(v)
+                    if self.level[v] == current:
+                        pending += 1
+                    else:
+                        learned.append(other)
+
+            # Walk back along the trail to the next literal involved
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reason[abs(literal)]]
+        learned[0] = -literal
+
+        # Watch the literal at the highest remaining level second
+        level = 0
+        if len(learned) > 1:
+            best = max(range(1, len(learned)),
+                       key=lambda i: self.level[abs(learned[i])])
+            learned[1], learned[best] = learned[best], learned[1]
+            level = self.level[abs(learned[1])]
+        return learned, level
+
+    def backtrack(self, level):
+        """Undoes assignments above decision level `level`."""
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            v = abs(literal)
+            self.polarity[v] = literal > 0
+            self.value[v] = None
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """
+        Returns the most active unassigned variable with its last value,
+        or None if every variable is assigned.
+        """
+        best = None
+        for v, value in self.value.items():
+            if value is None and (
+                best is None or self.activity[v] > self.activity[best]
+            ):
+                best = v
+        if best is None:
+            return None
+        return best if self.polarity[best] else -best
+
+    def bump(self, v):
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            for other in self.activity:
+                self.activity[other] *= 1e-100
+            self.increment *= 1e-100
+
+    def decay(self):
+        self.increment /= 0.95